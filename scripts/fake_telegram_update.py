@@ -0,0 +1,59 @@
+"""Post a fake Telegram update to a locally running webhook endpoint."""
+
+import argparse
+import os
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def build_message_update(update_id: int, user_id: int, text: str) -> dict:
+    """
+    Build a minimal private-chat text message update.
+
+    Args:
+        update_id: Update ID
+        user_id: Sender (and chat) ID
+        text: Message text
+
+    Returns:
+        Update JSON as a dictionary
+    """
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": "Test"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+def main():
+    """Send one or more fake updates and print the responses."""
+    port = os.getenv("WEBHOOK_PORT", "8443")
+    path = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("text", help="Message text to send")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{port}/{path}")
+    parser.add_argument("--secret", default=os.getenv("WEBHOOK_SECRET_TOKEN", ""))
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--count", type=int, default=1)
+    args = parser.parse_args()
+
+    headers = {"X-Telegram-Bot-Api-Secret-Token": args.secret}
+    with httpx.Client() as client:
+        for i in range(args.count):
+            update = build_message_update(int(time.time()) + i, args.user_id, args.text)
+            response = client.post(args.url, json=update, headers=headers)
+            print(f"Update {update['update_id']}: HTTP {response.status_code}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""In-process cache of Telegram file_ids for uploaded memes."""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from db.connection import run_in_db
+from db.meme_files import delete_file_id, get_all_file_ids, save_file_id
+
+logger = logging.getLogger(__name__)
+
+# bot_id -> {meme_id: file_id}, loaded from the database once per bot
+_file_ids: Dict[int, Dict[str, str]] = {}
+_load_lock = asyncio.Lock()
+
+
+async def _get_bot_file_ids(bot_id: int) -> Dict[str, str]:
+    """
+    Get file_id mapping for a bot, loading all stored ids on first use.
+
+    A failed load returns an empty mapping and is retried on the next call.
+    """
+    file_ids = _file_ids.get(bot_id)
+    if file_ids is None:
+        async with _load_lock:
+            file_ids = _file_ids.get(bot_id)
+            if file_ids is None:
+                file_ids = await run_in_db(get_all_file_ids, bot_id)
+                if file_ids is None:
+                    # Not cached, so the next call retries the load
+                    return {}
+                _file_ids[bot_id] = file_ids
+                logger.info(f"Loaded {len(file_ids)} meme file_ids")
+    return file_ids
+
+
+async def get_file_id(bot_id: int, meme_id: str) -> Optional[str]:
+    """
+    Get the Telegram file_id of a meme, if it was uploaded before.
+
+    Args:
+        bot_id: Telegram bot user ID
+        meme_id: Meme ID
+
+    Returns:
+        file_id string, or None if the meme has not been uploaded yet
+    """
+    return (await _get_bot_file_ids(bot_id)).get(meme_id)
+
+
+async def get_uploaded_meme_ids(bot_id: int) -> List[str]:
+    """
+    Get the IDs of all memes the bot has a file_id for.
+
+    Args:
+        bot_id: Telegram bot user ID
+
+    Returns:
+        List of meme IDs
+    """
+    return list(await _get_bot_file_ids(bot_id))
+
+
+async def remember_file_id(
+    bot_id: int, meme_id: str, file_id: str, file_unique_id: Optional[str] = None
+) -> None:
+    """
+    Remember the file_id Telegram returned after uploading a meme.
+
+    Args:
+        bot_id: Telegram bot user ID
+        meme_id: Meme ID
+        file_id: Telegram file_id of the uploaded photo
+        file_unique_id: Telegram file_unique_id of the uploaded photo
+    """
+    (await _get_bot_file_ids(bot_id))[meme_id] = file_id
+    await run_in_db(save_file_id, bot_id, meme_id, file_id, file_unique_id)
+
+
+async def forget_file_id(bot_id: int, meme_id: str) -> None:
+    """
+    Forget a file_id Telegram no longer accepts.
+
+    Args:
+        bot_id: Telegram bot user ID
+        meme_id: Meme ID
+    """
+    (await _get_bot_file_ids(bot_id)).pop(meme_id, None)
+    await run_in_db(delete_file_id, bot_id, meme_id)
@@ -4,7 +4,7 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from db.user_queries import update_user_query_selection
+from db.query_log import record_selection
 from bot.utils import send_selected_meme
 
 logger = logging.getLogger(__name__)
@@ -24,14 +24,15 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             meme_id = parts[1]
             user_query_id = int(parts[2]) if len(parts) > 2 else None
 
+            # Send first: recording the selection must not delay the photo
+            await send_selected_meme(update, meme_id)
             telegram_user_id = (
                 update.effective_user.id if update.effective_user else None
             )
             if telegram_user_id:
-                update_user_query_selection(
+                await record_selection(
                     telegram_user_id, meme_id, user_query_id=user_query_id
                 )
-            await send_selected_meme(update, meme_id)
         else:
             logger.warning(f"Unknown callback data: {query.data}")
             await query.answer("未知的操作", show_alert=True)
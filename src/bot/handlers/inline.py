@@ -0,0 +1,122 @@
+"""Handler for inline queries (@bot keyword in any chat)."""
+
+import asyncio
+import logging
+import os
+import random
+from collections import Counter
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from telegram import InlineQuery, InlineQueryResultCachedPhoto, Update
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from bot.file_ids import get_file_id, get_uploaded_meme_ids
+from db.connection import run_in_db
+from meme.selector import select_meme_by_alias
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the user to stop typing before searching
+INLINE_DEBOUNCE = float(os.getenv("INLINE_DEBOUNCE", 0.4))
+# Maximum results per answer (Telegram allows 50)
+INLINE_RESULT_LIMIT = int(os.getenv("INLINE_RESULT_LIMIT", 20))
+# Seconds Telegram may cache an answer and reuse it for the same query
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", 300))
+
+# telegram_user_id -> ID of the user's latest inline query awaiting an answer
+_pending: Dict[int, str] = {}
+
+inline_stats: Counter = Counter()
+
+
+async def _inline_results(
+    bot_id: int, query_text: str
+) -> List[InlineQueryResultCachedPhoto]:
+    """
+    Build inline results from memes the bot has already uploaded.
+
+    Only stored file_ids are used, so answering never downloads from R2.
+
+    Args:
+        bot_id: Telegram bot user ID
+        query_text: Inline query text
+
+    Returns:
+        List of cached photo results
+    """
+    if not query_text.strip():
+        # Empty query: a random selection of uploaded memes
+        meme_ids = await get_uploaded_meme_ids(bot_id)
+        meme_ids = random.sample(meme_ids, min(INLINE_RESULT_LIMIT, len(meme_ids)))
+        memes = [{"meme_id": meme_id} for meme_id in meme_ids]
+    else:
+        memes = await run_in_db(
+            select_meme_by_alias, query_text, count=INLINE_RESULT_LIMIT
+        )
+
+    results = []
+    for meme in memes:
+        file_id = await get_file_id(bot_id, meme["meme_id"])
+        if not file_id:
+            # Not uploaded yet; sending it in a chat once makes it available
+            continue
+        results.append(
+            InlineQueryResultCachedPhoto(
+                id=meme["meme_id"],
+                photo_file_id=file_id,
+                title=meme.get("name"),
+            )
+        )
+    return results
+
+
+async def _answer(inline_query: InlineQuery, bot_id: int) -> None:
+    """Answer an inline query unless a newer one arrives while waiting."""
+    telegram_user_id = inline_query.from_user.id
+    await asyncio.sleep(INLINE_DEBOUNCE)
+    if _pending.get(telegram_user_id) != inline_query.id:
+        # The user kept typing; the newer query answers instead
+        inline_stats["debounced"] += 1
+        return
+    del _pending[telegram_user_id]
+    try:
+        results = await _inline_results(bot_id, inline_query.query)
+        # Results depend only on the query text, so Telegram may share them
+        await inline_query.answer(
+            results, cache_time=INLINE_CACHE_TIME, is_personal=False
+        )
+        inline_stats["answered"] += 1
+    except BadRequest as e:
+        # e.g. the query expired while searching
+        inline_stats["expired"] += 1
+        logger.warning(f"Failed to answer inline query: {e}")
+    except Exception as e:
+        inline_stats["errors"] += 1
+        logger.error(f"Error answering inline query: {e}", exc_info=True)
+
+
+async def inline_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handle inline queries.
+
+    A query arrives on every keystroke. Each one replaces the user's pending
+    query, so only the query the user stopped typing at is searched.
+    """
+    inline_query = update.inline_query
+    if not inline_query:
+        return
+
+    _pending[inline_query.from_user.id] = inline_query.id
+    # Tracked by the application, which waits for it before shutting down
+    context.application.create_task(
+        _answer(inline_query, context.bot.id), update=update
+    )
+
+
+def get_inline_stats() -> Dict[str, int]:
+    """Get inline query counters."""
+    return {**inline_stats, "pending": len(_pending)}
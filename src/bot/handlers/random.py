@@ -4,7 +4,8 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from db.user_queries import check_and_update_rate_limit, create_user_query
+from db.connection import run_in_db
+from db.rate_limiter import admit_query
 from meme.selector import select_meme_by_random
 from bot.utils import send_meme_selection
 
@@ -16,21 +17,19 @@ async def random_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     telegram_user_id = update.effective_user.id if update.effective_user else None
 
     try:
-        # Check rate limit
+        # Check rate limit and record the query
+        user_query_id: int | None = None
         if telegram_user_id:
-            is_allowed, error_msg = check_and_update_rate_limit(telegram_user_id)
+            is_allowed, error_msg, user_query_id = await admit_query(
+                telegram_user_id, query_text=None
+            )
             if not is_allowed:
                 await update.message.reply_text(
                     error_msg or "今日查詢次數已達上限，請明天再試！"
                 )
                 return
 
-        user_query_id: int | None = None
-        if telegram_user_id:
-            user_query = create_user_query(telegram_user_id, query_text=None)
-            if user_query:
-                user_query_id = user_query.id
-        memes = select_meme_by_random("random", count=3)
+        memes = await run_in_db(select_meme_by_random, "random", count=3)
         await send_meme_selection(
             update,
             memes,
@@ -0,0 +1,212 @@
+"""Byte-budgeted LRU cache for meme images fetched from R2."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (set R2_IMAGE_CACHE_MB=0 to disable the memory tier)
+R2_IMAGE_CACHE_MB = float(os.getenv("R2_IMAGE_CACHE_MB", 64))
+R2_IMAGE_CACHE_DIR = os.getenv("R2_IMAGE_CACHE_DIR")  # Disk tier off if unset
+R2_IMAGE_CACHE_DISK_MB = float(os.getenv("R2_IMAGE_CACHE_DISK_MB", 512))
+
+_MB = 1024 * 1024
+
+
+class _DiskTier:
+    """Size-bounded on-disk LRU store, evicting least recently used files."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+        # Resume from files left by a previous run, oldest access first
+        files = sorted(self.directory.glob("*.bin"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._sizes[path.name] = size
+            self._bytes += size
+        self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.bin"
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            (self.directory / name).unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        with self._lock:
+            if path.name not in self._sizes:
+                return None
+            self._sizes.move_to_end(path.name)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Keep access order across restarts
+            return data
+        except OSError:
+            with self._lock:
+                size = self._sizes.pop(path.name, 0)
+                self._bytes -= size
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Failed to write image cache file: {e}")
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._bytes -= self._sizes.pop(path.name, 0)
+            self._sizes[path.name] = len(data)
+            self._bytes += len(data)
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+
+class ImageCache:
+    """In-process LRU image cache bounded by total bytes, with optional disk tier."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        """
+        Initialize image cache.
+
+        Args:
+            max_bytes: Memory budget in bytes (0 disables the memory tier)
+            disk_dir: Directory for the on-disk tier, or None to disable it
+            disk_max_bytes: Disk budget in bytes
+        """
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk: Optional[_DiskTier] = None
+        if disk_dir and disk_max_bytes > 0:
+            self._disk = _DiskTier(Path(disk_dir), disk_max_bytes)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any tier can hold images."""
+        return self.max_bytes > 0 or self._disk is not None
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get cached image bytes.
+
+        Args:
+            key: Object key
+
+        Returns:
+            Image bytes, or None on a miss
+        """
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        if self._disk is not None:
+            data = await asyncio.to_thread(self._disk.get, key)
+            if data is not None:
+                self.disk_hits += 1
+                self._put_memory(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        """
+        Store image bytes in the cache.
+
+        Args:
+            key: Object key
+            data: Image bytes
+        """
+        self._put_memory(key, data)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, data)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current sizes."""
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self.evictions,
+            "memory_items": len(self._items),
+            "memory_bytes": self._bytes,
+            "disk_evictions": self._disk.evictions if self._disk else 0,
+            "disk_bytes": self._disk.size if self._disk else 0,
+        }
+
+
+# Global cache instance
+_image_cache: Optional[ImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+    """Get or create global image cache."""
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache(
+            max_bytes=int(R2_IMAGE_CACHE_MB * _MB),
+            disk_dir=R2_IMAGE_CACHE_DIR,
+            disk_max_bytes=int(R2_IMAGE_CACHE_DISK_MB * _MB),
+        )
+    return _image_cache
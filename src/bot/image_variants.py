@@ -0,0 +1,62 @@
+"""Re-encoded image variants stored next to the original meme images in R2."""
+
+import os
+from typing import Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Serve pre-built variants (run tools/build_variants.py first)
+IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS", "false").lower() == "true"
+
+# Bump when the variant settings change; variants are stored under a new prefix
+IMAGE_VARIANT_VERSION = 1
+
+ORIGINAL = "original"
+PHOTO = "photo"
+THUMB = "thumb"
+
+
+class ImageVariant:
+    """Size limits and JPEG settings of one variant."""
+
+    __slots__ = ("name", "max_side", "max_bytes", "quality")
+
+    def __init__(self, name: str, max_side: int, max_bytes: int, quality: int):
+        """
+        Initialize variant.
+
+        Args:
+            name: Variant name, part of the object key
+            max_side: Longest side in pixels
+            max_bytes: Size cap of the encoded JPEG
+            quality: Initial JPEG quality, lowered until max_bytes is met
+        """
+        self.name = name
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        self.quality = quality
+
+
+# Telegram downscales photos to 1280px anyway, so larger originals only cost bytes
+VARIANTS: Dict[str, ImageVariant] = {
+    PHOTO: ImageVariant(PHOTO, max_side=1280, max_bytes=400 * 1024, quality=85),
+    THUMB: ImageVariant(THUMB, max_side=320, max_bytes=40 * 1024, quality=75),
+}
+
+
+def variant_key(meme_id: str, variant: str = ORIGINAL) -> str:
+    """
+    Get the R2 object key of a meme image variant.
+
+    Args:
+        meme_id: Meme ID
+        variant: ORIGINAL, PHOTO or THUMB
+
+    Returns:
+        Object key, e.g. "SS0001.jpg" or "variants/v1/thumb/SS0001.jpg"
+    """
+    if variant == ORIGINAL:
+        return f"{meme_id}.jpg"
+    return f"variants/v{IMAGE_VARIANT_VERSION}/{variant}/{meme_id}.jpg"
@@ -1,13 +1,14 @@
 """Main entry point for the Telegram bot."""
 
+import asyncio
 import os
 from dotenv import load_dotenv
-from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
     filters,
 )
 
@@ -15,7 +16,27 @@ from bot.handlers.start import start_handler
 from bot.handlers.message import message_handler
 from bot.handlers.random import random_handler
 from bot.handlers.callback import callback_handler
+from bot.handlers.inline import inline_query_handler
 from bot.logger import get_logger, setup_logging
+from bot.metrics import METRICS_LOG_INTERVAL, run_metrics_logger
+from bot.r2_client import close_r2_client
+from bot.subscriptions import derive_allowed_updates, install_unhandled_update_counter
+from bot.update_processor import BOT_CONCURRENT_UPDATES, PerChatUpdateProcessor
+from bot.webhook import run_webhook, use_webhook
+from db.connection import run_in_db
+from db.query_log import get_query_log, use_async_query_log
+from db.rate_limiter import (
+    get_rate_limiter,
+    run_rate_limit_flusher,
+    use_memory_rate_limit,
+)
+from meme.catalogue_sync import (
+    CATALOGUE_LISTEN,
+    CATALOGUE_POLL_INTERVAL,
+    load_catalogue_version,
+    run_catalogue_listener,
+    run_catalogue_poller,
+)
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +47,41 @@ setup_logging()
 logger = get_logger(__name__)
 
 
+async def on_startup(application: Application) -> None:
+    """Start background services before the bot begins processing updates."""
+    await run_in_db(load_catalogue_version)
+    if CATALOGUE_POLL_INTERVAL > 0:
+        application.bot_data["background_tasks"].append(
+            asyncio.create_task(run_catalogue_poller())
+        )
+    if CATALOGUE_LISTEN:
+        application.bot_data["background_tasks"].append(
+            asyncio.create_task(run_catalogue_listener())
+        )
+    if use_memory_rate_limit():
+        await run_in_db(get_rate_limiter().load)
+        application.bot_data["background_tasks"].append(
+            asyncio.create_task(run_rate_limit_flusher())
+        )
+    if METRICS_LOG_INTERVAL > 0:
+        application.bot_data["background_tasks"].append(
+            asyncio.create_task(run_metrics_logger(application))
+        )
+    if use_async_query_log():
+        application.bot_data["background_tasks"].append(
+            asyncio.create_task(get_query_log().run())
+        )
+
+
+async def on_shutdown(application: Application) -> None:
+    """Stop background services, letting them flush pending writes."""
+    tasks = application.bot_data.get("background_tasks", [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_r2_client()
+
+
 def main():
     """Initialize and start the bot."""
     token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -33,19 +89,46 @@ def main():
         raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
 
     # Create application
-    application = Application.builder().token(token).build()
+    builder = (
+        Application.builder()
+        .token(token)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+    )
+    if BOT_CONCURRENT_UPDATES > 1:
+        # Different chats run in parallel, each chat's updates stay in order
+        builder = builder.concurrent_updates(PerChatUpdateProcessor())
+    application = builder.build()
+    application.bot_data["background_tasks"] = []
 
     # Register handlers
-    application.add_handler(CommandHandler("start", start_handler))
-    application.add_handler(CommandHandler("random", random_handler))
+    # Handlers reply via update.message, so only new messages are subscribed to
+    application.add_handler(
+        CommandHandler("start", start_handler, filters=filters.UpdateType.MESSAGE)
+    )
     application.add_handler(
-        MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler)
+        CommandHandler("random", random_handler, filters=filters.UpdateType.MESSAGE)
+    )
+    application.add_handler(
+        MessageHandler(
+            filters.UpdateType.MESSAGE & filters.TEXT & ~filters.COMMAND,
+            message_handler,
+        )
     )
     application.add_handler(CallbackQueryHandler(callback_handler))
+    # Needs inline mode enabled for the bot in @BotFather (/setinline)
+    application.add_handler(InlineQueryHandler(inline_query_handler))
+
+    # Subscribe only to update types some handler uses, count any unhandled ones
+    allowed_updates = derive_allowed_updates(application)
+    install_unhandled_update_counter(application)
 
     # Start the bot
-    logger.info("Bot is starting...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    logger.info(f"Bot is starting (allowed updates: {allowed_updates})...")
+    if use_webhook():
+        run_webhook(application, allowed_updates=allowed_updates)
+    else:
+        application.run_polling(allowed_updates=allowed_updates)
 
 
 if __name__ == "__main__":
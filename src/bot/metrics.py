@@ -0,0 +1,75 @@
+"""Periodic logging of runtime metrics (pool, caches, update processing)."""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from telegram.ext import Application
+
+from bot.handlers.inline import get_inline_stats
+from bot.image_cache import get_image_cache
+from bot.prefetch import get_image_prefetcher
+from bot.r2_client import get_r2_stats
+from bot.subscriptions import get_dropped_update_stats
+from bot.update_processor import PerChatUpdateProcessor
+from db.connection import get_pool_stats
+from meme.catalogue import get_catalogue_version
+from meme.result_cache import get_result_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between metrics log lines (0 disables)
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", 0))
+
+
+def collect_metrics(
+    application: Optional[Application] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Collect metrics from all instrumented components.
+
+    Args:
+        application: Bot application, for update queue and handler metrics
+
+    Returns:
+        Dictionary mapping component name to its metrics
+    """
+    metrics: Dict[str, Dict[str, Any]] = {
+        "db_pool": get_pool_stats(),
+        "image_cache": get_image_cache().stats(),
+        "r2": get_r2_stats(),
+        "prefetch": get_image_prefetcher().stats(),
+        "result_cache": get_result_cache().stats(),
+        "catalogue": {"version": get_catalogue_version()},
+    }
+    if application is not None:
+        updates: Dict[str, Any] = {"queue_depth": application.update_queue.qsize()}
+        processor = application.update_processor
+        if isinstance(processor, PerChatUpdateProcessor):
+            updates.update(processor.stats())
+        else:
+            updates["in_flight"] = processor.current_concurrent_updates
+        metrics["updates"] = updates
+        metrics["dropped_updates"] = get_dropped_update_stats()
+        metrics["inline"] = get_inline_stats()
+    return metrics
+
+
+async def run_metrics_logger(
+    application: Optional[Application] = None, interval: float = METRICS_LOG_INTERVAL
+) -> None:
+    """
+    Log collected metrics every interval seconds until cancelled.
+
+    Args:
+        application: Bot application, for update queue and handler metrics
+        interval: Seconds between log lines
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for name, values in collect_metrics(application).items():
+            logger.info(f"Metrics {name}: {values}")
@@ -0,0 +1,171 @@
+"""Background prefetching of meme images offered in a selection keyboard."""
+
+import asyncio
+import logging
+import os
+from functools import partial
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from bot.file_ids import get_file_id
+from bot.image_cache import get_image_cache
+from bot.utils import get_image_from_r2
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Images fetched at once across all selections (0 disables prefetching)
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", 4))
+# Seconds a selection keeps its prefetches; unclicked ones are dropped after
+PREFETCH_TIMEOUT = float(os.getenv("PREFETCH_TIMEOUT", 60))
+
+
+class ImagePrefetcher:
+    """Warms the image cache for shown candidates, one task per meme."""
+
+    def __init__(
+        self, concurrency: int = PREFETCH_CONCURRENCY, timeout: float = PREFETCH_TIMEOUT
+    ):
+        """
+        Initialize prefetcher.
+
+        Args:
+            concurrency: Maximum number of images fetched at once
+            timeout: Seconds before a selection's prefetches are dropped
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Memes whose task holds a semaphore slot (the rest are queued)
+        self._running: Set[str] = set()
+        # Selections still holding each meme's task
+        self._refs: Dict[str, int] = {}
+        # group -> (meme_ids, expiry timer)
+        self._groups: Dict[Hashable, Tuple[Set[str], asyncio.TimerHandle]] = {}
+
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+
+    async def _fetch(self, meme_id: str) -> None:
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self._semaphore:
+                    self._running.add(meme_id)
+                    try:
+                        # Fills the image cache; errors are logged by get_image_from_r2
+                        await get_image_from_r2(meme_id)
+                    finally:
+                        self._running.discard(meme_id)
+            self.completed += 1
+        except TimeoutError:
+            self.timed_out += 1
+
+    def _on_done(self, meme_id: str, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self.cancelled += 1
+        if self._tasks.get(meme_id) is task:
+            del self._tasks[meme_id]
+
+    async def prefetch(
+        self, group: Hashable, bot_id: int, meme_ids: Iterable[str]
+    ) -> None:
+        """
+        Start fetching the images of shown candidates in the background.
+
+        Memes the bot already has a file_id for are skipped, since Telegram
+        serves those without an upload. Nothing is fetched when the image
+        cache is disabled.
+
+        Args:
+            group: Key of the selection, e.g. (chat_id, message_id)
+            bot_id: Telegram bot user ID
+            meme_ids: Meme IDs shown in the selection
+        """
+        if self.concurrency <= 0 or not get_image_cache().enabled:
+            # Without a cache the prefetched image would be downloaded twice
+            return
+        held: Set[str] = set()
+        for meme_id in meme_ids:
+            if meme_id in held or await get_file_id(bot_id, meme_id):
+                continue
+            if meme_id not in self._tasks:
+                task = asyncio.create_task(self._fetch(meme_id))
+                task.add_done_callback(partial(self._on_done, meme_id))
+                self._tasks[meme_id] = task
+                self.started += 1
+            self._refs[meme_id] = self._refs.get(meme_id, 0) + 1
+            held.add(meme_id)
+        if held:
+            timer = asyncio.get_running_loop().call_later(
+                self.timeout, self.release, group
+            )
+            self._groups[group] = (held, timer)
+
+    def release(self, group: Hashable, keep: Optional[str] = None) -> None:
+        """
+        Drop a selection's prefetches, cancelling those no other selection holds.
+
+        Args:
+            group: Key the selection was prefetched under
+            keep: Meme ID to let finish (e.g. the one the user picked)
+        """
+        entry = self._groups.pop(group, None)
+        if entry is None:
+            return
+        meme_ids, timer = entry
+        timer.cancel()
+        for meme_id in meme_ids:
+            refs = self._refs.pop(meme_id, 1) - 1
+            if refs > 0:
+                self._refs[meme_id] = refs
+                continue
+            task = self._tasks.get(meme_id)
+            if task is not None and meme_id != keep:
+                task.cancel()
+
+    async def wait(self, meme_id: str) -> None:
+        """
+        Wait for a running prefetch of a meme, so its image comes from cache.
+
+        A prefetch still queued behind other selections is cancelled instead,
+        so the caller fetches the image itself without waiting for a slot.
+
+        Args:
+            meme_id: Meme ID
+        """
+        task = self._tasks.get(meme_id)
+        if task is None:
+            return
+        if meme_id in self._running:
+            await asyncio.wait({task})
+        else:
+            del self._tasks[meme_id]
+            task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Get prefetch counters."""
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "timed_out": self.timed_out,
+            "in_flight": len(self._tasks),
+            "selections": len(self._groups),
+        }
+
+
+# Global prefetcher instance
+_prefetcher: Optional[ImagePrefetcher] = None
+
+
+def get_image_prefetcher() -> ImagePrefetcher:
+    """Get or create global image prefetcher."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = ImagePrefetcher()
+    return _prefetcher
@@ -0,0 +1,190 @@
+"""Async client for reading meme images from Cloudflare R2 (S3-compatible)."""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+from botocore.auth import S3SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cloudflare R2 configuration (any S3-compatible endpoint works, e.g. MinIO)
+R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
+R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
+R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "spongebob-memes")
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")
+R2_REGION = os.getenv("R2_REGION", "auto")
+
+# Connection pool and timeouts
+R2_MAX_CONNECTIONS = int(os.getenv("R2_MAX_CONNECTIONS", 20))
+R2_KEEPALIVE_EXPIRY = float(os.getenv("R2_KEEPALIVE_EXPIRY", 60))  # Idle seconds
+R2_CONNECT_TIMEOUT = float(os.getenv("R2_CONNECT_TIMEOUT", 3))
+R2_READ_TIMEOUT = float(os.getenv("R2_READ_TIMEOUT", 5))  # Between received chunks
+R2_REQUEST_TIMEOUT = float(os.getenv("R2_REQUEST_TIMEOUT", 10))  # Whole download
+R2_MAX_OBJECT_MB = float(os.getenv("R2_MAX_OBJECT_MB", 10))  # Telegram photo limit
+
+_MB = 1024 * 1024
+
+
+class R2Error(Exception):
+    """Object could not be read from R2."""
+
+
+class R2Client:
+    """Object reads over a pooled keep-alive HTTP connection, signed with SigV4."""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        access_key_id: str,
+        secret_access_key: str,
+        bucket: str = R2_BUCKET_NAME,
+        region: str = R2_REGION,
+        max_connections: int = R2_MAX_CONNECTIONS,
+        max_object_bytes: int = int(R2_MAX_OBJECT_MB * _MB),
+    ):
+        """
+        Initialize R2 client.
+
+        Args:
+            endpoint_url: S3 API endpoint, e.g. https://<account>.r2.cloudflarestorage.com
+            access_key_id: Access key ID
+            secret_access_key: Secret access key
+            bucket: Bucket name
+            region: Signing region ("auto" for R2)
+            max_connections: Maximum concurrent connections to the endpoint
+            max_object_bytes: Objects larger than this are rejected while streaming
+        """
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.max_object_bytes = max_object_bytes
+        self._signer = S3SigV4Auth(
+            Credentials(access_key_id, secret_access_key), "s3", region
+        )
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=R2_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                R2_READ_TIMEOUT, connect=R2_CONNECT_TIMEOUT, pool=R2_CONNECT_TIMEOUT
+            ),
+        )
+
+        self.requests = 0
+        self.errors = 0
+        self.bytes_read = 0
+
+    def object_url(self, key: str) -> str:
+        """Get the path-style URL of an object."""
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/')}"
+
+    def _signed_headers(self, method: str, url: str) -> Dict[str, str]:
+        request = AWSRequest(method=method, url=url)
+        self._signer.add_auth(request)
+        return dict(request.headers.items())
+
+    async def get_object(self, key: str) -> Optional[bytes]:
+        """
+        Download an object, streaming the body into a single buffer.
+
+        Args:
+            key: Object key
+
+        Returns:
+            Object bytes, or None if the object does not exist
+
+        Raises:
+            R2Error: On HTTP errors, oversized objects and timeouts
+        """
+        url = self.object_url(key)
+        self.requests += 1
+        try:
+            async with asyncio.timeout(R2_REQUEST_TIMEOUT):
+                async with self._client.stream(
+                    "GET", url, headers=self._signed_headers("GET", url)
+                ) as response:
+                    if response.status_code == 404:
+                        return None
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise R2Error(
+                            f"GET {key} failed with HTTP {response.status_code}: "
+                            f"{response.text[:200]}"
+                        )
+                    length = int(response.headers.get("content-length", 0))
+                    if length > self.max_object_bytes:
+                        raise R2Error(f"{key} is too large ({length} bytes)")
+
+                    chunks: List[bytes] = []
+                    size = 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_object_bytes:
+                            raise R2Error(f"{key} is too large (over {size} bytes)")
+                        chunks.append(chunk)
+        except R2Error:
+            self.errors += 1
+            raise
+        except (httpx.HTTPError, TimeoutError) as e:
+            self.errors += 1
+            raise R2Error(f"GET {key} failed: {e!r}") from e
+
+        self.bytes_read += size
+        # Single copy: chunks straight into the bytes handed to Telegram
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Get request counters."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+        }
+
+
+# Global client instance
+_r2_client: Optional[R2Client] = None
+
+
+def get_r2_client() -> R2Client:
+    """Get or create global R2 client."""
+    global _r2_client
+    if _r2_client is None:
+        if not all([R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_ENDPOINT_URL]):
+            raise ValueError(
+                "R2 configuration missing. Please set R2_ACCESS_KEY_ID, "
+                "R2_SECRET_ACCESS_KEY, and R2_ENDPOINT_URL environment variables."
+            )
+        _r2_client = R2Client(
+            endpoint_url=R2_ENDPOINT_URL,  # type: ignore[arg-type]
+            access_key_id=R2_ACCESS_KEY_ID,  # type: ignore[arg-type]
+            secret_access_key=R2_SECRET_ACCESS_KEY,  # type: ignore[arg-type]
+        )
+    return _r2_client
+
+
+def get_r2_stats() -> Dict[str, int]:
+    """Get request counters of the global R2 client (empty if not created)."""
+    return _r2_client.stats() if _r2_client is not None else {}
+
+
+async def close_r2_client() -> None:
+    """Close the global R2 client, if it was created."""
+    global _r2_client
+    if _r2_client is not None:
+        await _r2_client.aclose()
+        _r2_client = None
@@ -0,0 +1,147 @@
+"""Update subscriptions derived from the registered handlers."""
+
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from telegram import Update
+from telegram.ext import (
+    Application,
+    BaseHandler,
+    CallbackQueryHandler,
+    ChosenInlineResultHandler,
+    CommandHandler,
+    ContextTypes,
+    InlineQueryHandler,
+    MessageHandler,
+    TypeHandler,
+    filters,
+)
+
+logger = logging.getLogger(__name__)
+
+# Update types a message filter can match when it doesn't restrict them
+_MESSAGE_UPDATE_TYPES = {
+    Update.MESSAGE,
+    Update.EDITED_MESSAGE,
+    Update.CHANNEL_POST,
+    Update.EDITED_CHANNEL_POST,
+    Update.BUSINESS_MESSAGE,
+    Update.EDITED_BUSINESS_MESSAGE,
+}
+
+_UPDATE_TYPE_FILTERS = {
+    filters.UpdateType.MESSAGE: {Update.MESSAGE},
+    filters.UpdateType.EDITED_MESSAGE: {Update.EDITED_MESSAGE},
+    filters.UpdateType.MESSAGES: {Update.MESSAGE, Update.EDITED_MESSAGE},
+    filters.UpdateType.CHANNEL_POST: {Update.CHANNEL_POST},
+    filters.UpdateType.EDITED_CHANNEL_POST: {Update.EDITED_CHANNEL_POST},
+    filters.UpdateType.CHANNEL_POSTS: {Update.CHANNEL_POST, Update.EDITED_CHANNEL_POST},
+    filters.UpdateType.EDITED: {Update.EDITED_MESSAGE, Update.EDITED_CHANNEL_POST},
+    filters.UpdateType.BUSINESS_MESSAGE: {Update.BUSINESS_MESSAGE},
+    filters.UpdateType.EDITED_BUSINESS_MESSAGE: {Update.EDITED_BUSINESS_MESSAGE},
+    filters.UpdateType.BUSINESS_MESSAGES: {
+        Update.BUSINESS_MESSAGE,
+        Update.EDITED_BUSINESS_MESSAGE,
+    },
+}
+
+_HANDLER_UPDATE_TYPES = {
+    CallbackQueryHandler: {Update.CALLBACK_QUERY},
+    InlineQueryHandler: {Update.INLINE_QUERY},
+    ChosenInlineResultHandler: {Update.CHOSEN_INLINE_RESULT},
+}
+
+# Dropped updates per update type
+dropped_updates: Counter = Counter()
+
+
+def _filter_update_types(update_filter: Optional[filters.BaseFilter]) -> Set[str]:
+    """Message update types a (possibly combined) filter can match."""
+    if update_filter is None:
+        return set(_MESSAGE_UPDATE_TYPES)
+    if update_filter in _UPDATE_TYPE_FILTERS:
+        return set(_UPDATE_TYPE_FILTERS[update_filter])
+
+    base = getattr(update_filter, "base_filter", None)
+    and_filter = getattr(update_filter, "and_filter", None)
+    or_filter = getattr(update_filter, "or_filter", None)
+    if base is not None and isinstance(and_filter, filters.BaseFilter):
+        return _filter_update_types(base) & _filter_update_types(and_filter)
+    if base is not None and isinstance(or_filter, filters.BaseFilter):
+        return _filter_update_types(base) | _filter_update_types(or_filter)
+    # Content filters, inversions etc. don't narrow the update type
+    return set(_MESSAGE_UPDATE_TYPES)
+
+
+def handler_update_types(handler: BaseHandler) -> Set[str]:
+    """
+    Get the update types a handler can handle.
+
+    Args:
+        handler: Registered handler
+
+    Returns:
+        Set of update type names (e.g. "message", "callback_query")
+    """
+    if isinstance(handler, (MessageHandler, CommandHandler)):
+        return _filter_update_types(handler.filters)
+    for handler_type, update_types in _HANDLER_UPDATE_TYPES.items():
+        if isinstance(handler, handler_type):
+            return set(update_types)
+    # Unknown handler types may handle anything
+    return set(Update.ALL_TYPES)
+
+
+def derive_allowed_updates(application: Application) -> List[str]:
+    """
+    Derive the update types to subscribe to from the registered handlers.
+
+    Args:
+        application: Bot application with all handlers registered
+
+    Returns:
+        Sorted list of update type names for allowed_updates
+    """
+    update_types: Set[str] = set()
+    for group, handlers in application.handlers.items():
+        if group < 0:
+            continue
+        for handler in handlers:
+            update_types |= handler_update_types(handler)
+    return sorted(str(update_type) for update_type in update_types)
+
+
+def _update_type(update: Update) -> str:
+    for update_type in Update.ALL_TYPES:
+        if getattr(update, update_type, None) is not None:
+            return str(update_type)
+    return "unknown"
+
+
+def install_unhandled_update_counter(application: Application) -> None:
+    """
+    Count updates no registered handler matches, per update type.
+
+    With allowed_updates derived from the handlers Telegram rarely sends such
+    updates, and PTB already ignores them. The counter is a catch-all handler
+    appended to the last handler group: PTB runs only the first matching
+    handler of a group, so it sees just the updates the group's other
+    handlers passed on, at no extra cost for handled ones.
+
+    Args:
+        application: Bot application with all handlers registered
+    """
+
+    async def count_unhandled(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        update_type = _update_type(update)
+        dropped_updates[update_type] += 1
+        logger.debug(f"Dropped unhandled {update_type} update {update.update_id}")
+
+    group = max((group for group in application.handlers if group >= 0), default=0)
+    application.add_handler(TypeHandler(Update, count_unhandled), group=group)
+
+
+def get_dropped_update_stats() -> Dict[str, int]:
+    """Get dropped update counts per update type."""
+    return dict(dropped_updates)
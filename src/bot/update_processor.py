@@ -0,0 +1,116 @@
+"""Concurrent update processing that keeps updates of one chat in order."""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+load_dotenv()
+
+# Handlers running at the same time (across different chats); 1 is sequential
+BOT_CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", 32))
+# Updates admitted for processing, including ones waiting behind their chat
+BOT_MAX_PENDING_UPDATES = int(os.getenv("BOT_MAX_PENDING_UPDATES", 256))
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Processes different chats in parallel and each chat's updates in order."""
+
+    def __init__(
+        self,
+        max_concurrent_handlers: int = BOT_CONCURRENT_UPDATES,
+        max_pending_updates: int = BOT_MAX_PENDING_UPDATES,
+    ):
+        """
+        Initialize update processor.
+
+        Args:
+            max_concurrent_handlers: Maximum number of handlers running at once
+            max_pending_updates: Maximum number of admitted updates, including
+                those waiting for an earlier update of the same chat
+        """
+        super().__init__(max(max_pending_updates, max_concurrent_handlers))
+        # Taken after the chat lock, so updates queued behind a busy chat
+        # don't occupy handler slots other chats could use
+        self._handler_slots = asyncio.Semaphore(max_concurrent_handlers)
+        # chat_id -> (lock, number of updates holding or waiting for it)
+        self._chat_locks: Dict[int, Tuple[asyncio.Lock, int]] = {}
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.processed = 0
+
+    @staticmethod
+    def _chat_id(update: object) -> Optional[int]:
+        if isinstance(update, Update) and update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    def _acquire_chat(self, chat_id: int) -> asyncio.Lock:
+        lock, users = self._chat_locks.get(chat_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._chat_locks[chat_id] = (lock, users + 1)
+        return lock
+
+    def _release_chat(self, chat_id: int) -> None:
+        lock, users = self._chat_locks[chat_id]
+        if users <= 1:
+            del self._chat_locks[chat_id]
+        else:
+            self._chat_locks[chat_id] = (lock, users - 1)
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        self.waiting += 1
+        try:
+            await self._handler_slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            await coroutine
+        finally:
+            self.in_flight -= 1
+            self.processed += 1
+            self._handler_slots.release()
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        """Run the update's handlers after earlier updates of the same chat."""
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            await self._run(coroutine)
+            return
+
+        lock = self._acquire_chat(chat_id)
+        try:
+            self.waiting += 1
+            try:
+                await lock.acquire()
+            finally:
+                self.waiting -= 1
+            try:
+                await self._run(coroutine)
+            finally:
+                lock.release()
+        finally:
+            self._release_chat(chat_id)
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to tear down."""
+
+    def stats(self) -> Dict[str, int]:
+        """Get handler concurrency counters."""
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "processed": self.processed,
+            "active_chats": len(self._chat_locks),
+        }
@@ -5,83 +5,193 @@ import io
 import logging
 import os
 import random
-from functools import partial
-from typing import Any, Dict, List, Optional
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-import boto3
-from botocore.exceptions import ClientError
+from typing import Dict, List, Optional, Tuple
+from telegram import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InputMediaPhoto,
+    Message,
+    Update,
+)
+from telegram.error import BadRequest, TelegramError
 from dotenv import load_dotenv
 
+from bot.file_ids import forget_file_id, get_file_id, remember_file_id
+from bot.image_cache import get_image_cache
+from bot.image_variants import (
+    IMAGE_VARIANTS_ENABLED,
+    ORIGINAL,
+    PHOTO,
+    THUMB,
+    variant_key,
+)
+from bot.r2_client import R2_BUCKET_NAME, R2Error, get_r2_client
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Cloudflare R2 configuration
-R2_ACCOUNT_ID = os.getenv("R2_ACCOUNT_ID")
-R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
-R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
-R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "spongebob-memes")
-R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")
-
-# Initialize R2 client
-_r2_client: Optional[Any] = None
-
-
-def get_r2_client():
-    """Get or create R2 S3 client."""
-    global _r2_client
-    if _r2_client is None:
-        if not all(
-            [R2_ACCOUNT_ID, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_ENDPOINT_URL]
-        ):
-            raise ValueError(
-                "R2 configuration missing. Please set R2_ACCOUNT_ID, R2_ACCESS_KEY_ID, "
-                "R2_SECRET_ACCESS_KEY, and R2_ENDPOINT_URL environment variables."
-            )
+# "text": numbered list with buttons, "album": candidate images plus buttons
+MEME_PICKER_MODE = os.getenv("MEME_PICKER_MODE", "text").lower()
+
+# bot_id -> {meme_id: file_id} of thumbnails uploaded for album pickers
+_thumb_file_ids: Dict[int, Dict[str, str]] = {}
 
-        _r2_client = boto3.client(
-            "s3",
-            endpoint_url=R2_ENDPOINT_URL,
-            aws_access_key_id=R2_ACCESS_KEY_ID,
-            aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-            region_name="auto",
-        )
-    return _r2_client
 
+async def _get_object(key: str) -> Optional[bytes]:
+    """Get object bytes from the image cache, or from R2 (filling the cache)."""
+    cache = get_image_cache()
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
 
-async def get_image_from_r2(meme_id: str) -> Optional[io.BytesIO]:
+    image_data = await get_r2_client().get_object(key)
+    if image_data is not None:
+        await cache.put(key, image_data)
+    return image_data
+
+
+async def get_image_from_r2(meme_id: str, variant: str = PHOTO) -> Optional[io.BytesIO]:
     """
-    Get image from Cloudflare R2.
+    Get image from Cloudflare R2, served from the image cache when possible.
 
     Args:
         meme_id: Meme ID (e.g., SK0001, SS0002)
+        variant: PHOTO for sending, THUMB for previews or ORIGINAL. Variants
+            are only used when enabled; missing ones fall back to the original.
 
     Returns:
         BytesIO object with image data, or None if not found
     """
     try:
-        client = get_r2_client()
-        key = f"{meme_id}.jpg"
-
-        # Run synchronous boto3 call in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        get_object_func = partial(client.get_object, Bucket=R2_BUCKET_NAME, Key=key)
-        response = await loop.run_in_executor(None, get_object_func)
-        image_data = response["Body"].read()
+        image_data = None
+        if IMAGE_VARIANTS_ENABLED and variant != ORIGINAL:
+            image_data = await _get_object(variant_key(meme_id, variant))
+            if image_data is None:
+                logger.warning(f"No {variant} variant of {meme_id}, using original")
+        if image_data is None:
+            key = variant_key(meme_id)
+            image_data = await _get_object(key)
+            if image_data is None:
+                logger.warning(f"Image not found in R2: {R2_BUCKET_NAME}/{key}")
+                return None
 
         return io.BytesIO(image_data)
-    except ClientError as e:
-        error_code = e.response.get("Error", {}).get("Code", "")
-        if error_code == "NoSuchKey":
-            logger.warning(f"Image not found in R2: spongebob-memes/{meme_id}.jpg")
-        else:
-            logger.error(f"Error getting image from R2: {e}")
+    except R2Error as e:
+        logger.error(f"Error getting image from R2: {e}")
         return None
     except Exception as e:
         logger.error(f"Unexpected error getting image from R2: {e}")
         return None
 
 
+async def reply_meme_photo(message: Message, meme_id: str, caption: str) -> bool:
+    """
+    Reply with a meme photo, reusing its Telegram file_id when available.
+
+    The image is only fetched from R2 and uploaded when the bot has no usable
+    file_id for the meme yet; the file_id of that upload is stored for reuse.
+
+    Args:
+        message: Telegram message to reply to
+        meme_id: Meme ID to send
+        caption: Caption text for the photo
+
+    Returns:
+        True if the photo was sent, False if the image could not be found
+    """
+    bot_id = message.get_bot().id
+    file_id = await get_file_id(bot_id, meme_id)
+    if file_id:
+        try:
+            await message.reply_photo(photo=file_id, caption=caption)
+            return True
+        except BadRequest as e:
+            # e.g. the bot token changed and the file_id belongs to another bot
+            logger.warning(f"Stored file_id rejected for meme_id {meme_id}: {e}")
+            await forget_file_id(bot_id, meme_id)
+
+    # A prefetch started when the selection was shown fills the cache
+    from bot.prefetch import get_image_prefetcher
+
+    await get_image_prefetcher().wait(meme_id)
+    image_data = await get_image_from_r2(meme_id)
+    if not image_data:
+        logger.warning(f"Failed to get image from R2 for meme_id: {meme_id}")
+        return False
+
+    image_data.seek(0)  # Reset file pointer
+    sent = await message.reply_photo(photo=image_data, caption=caption)
+    if sent.photo:
+        photo = sent.photo[-1]  # Largest size
+        await remember_file_id(bot_id, meme_id, photo.file_id, photo.file_unique_id)
+    return True
+
+
+async def _album_media(
+    bot_id: int, meme_id: str, caption: str
+) -> Tuple[Optional[InputMediaPhoto], bool]:
+    """Get album media for a meme: a stored file_id, else an uploaded thumbnail."""
+    file_id = await get_file_id(bot_id, meme_id) or _thumb_file_ids.get(bot_id, {}).get(
+        meme_id
+    )
+    if file_id:
+        return InputMediaPhoto(file_id, caption=caption), False
+    image_data = await get_image_from_r2(meme_id, THUMB)
+    if not image_data:
+        return None, False
+    return InputMediaPhoto(image_data, caption=caption), True
+
+
+async def send_album_picker(
+    message: Message, meme_ids: List[str], captions: List[str]
+) -> bool:
+    """
+    Reply with the candidates as one album of file_ids or thumbnails.
+
+    Images are fetched concurrently. The file_ids of uploaded thumbnails are
+    kept in memory for later albums; they are not stored as the meme's
+    file_id since they are low resolution.
+
+    Args:
+        message: Telegram message to reply to
+        meme_ids: Candidate meme IDs
+        captions: Caption per candidate
+
+    Returns:
+        True if the album was sent, False if fewer than two images were found
+        or sending failed
+    """
+    bot_id = message.get_bot().id
+    results = await asyncio.gather(
+        *(
+            _album_media(bot_id, meme_id, caption)
+            for meme_id, caption in zip(meme_ids, captions)
+        )
+    )
+    media = [
+        (meme_id, item, uploaded)
+        for meme_id, (item, uploaded) in zip(meme_ids, results)
+        if item is not None
+    ]
+    if len(media) < 2:
+        # sendMediaGroup needs at least two items
+        return False
+
+    try:
+        sent = await message.reply_media_group(media=[item for _, item, _ in media])
+    except TelegramError as e:
+        # e.g. timeouts or flood control; the text picker is still sent
+        logger.warning(f"Failed to send album picker: {e}")
+        return False
+
+    thumb_file_ids = _thumb_file_ids.setdefault(bot_id, {})
+    for (meme_id, _, uploaded), sent_message in zip(media, sent):
+        if uploaded and sent_message.photo:
+            thumb_file_ids[meme_id] = sent_message.photo[-1].file_id
+    return True
+
+
 async def send_meme_photo(
     update: "Update",
     meme_result: Optional[dict],
@@ -113,16 +223,10 @@ async def send_meme_photo(
         return False
 
     try:
-        # Get image from R2
-        image_data = await get_image_from_r2(meme_id)
-        if image_data:
-            image_data.seek(0)  # Reset file pointer
-            await update.message.reply_photo(photo=image_data, caption=caption)
+        if await reply_meme_photo(update.message, meme_id, caption):
             return True
-        else:
-            logger.warning(f"Failed to get image from R2 for meme_id: {meme_id}")
-            await update.message.reply_text("找不到圖片，請稍後再試！")
-            return False
+        await update.message.reply_text("找不到圖片，請稍後再試！")
+        return False
     except Exception as e:
         logger.error(f"Error sending meme photo: {e}", exc_info=True)
         await update.message.reply_text("發生錯誤，請稍後再試！")
@@ -175,29 +279,22 @@ async def send_meme_selection(
         # If only one meme, send it directly
         if len(meme_ids) == 1:
             meme_id = meme_ids[0]
-            image_data = await get_image_from_r2(meme_id)
-            if image_data:
-                image_data.seek(0)
-                # Use same response templates as selector
-                response_texts = ["這張給你！", "希望這張適合你", "找到了！"]
-                caption = random.choice(response_texts)
-                telegram_user_id = (
-                    update.effective_user.id if update.effective_user else None
-                )
-                if telegram_user_id and user_query_id:
-                    from db.user_queries import update_user_query_selection
-
-                    update_user_query_selection(
-                        telegram_user_id, meme_id, user_query_id
-                    )
-
-                await update.message.reply_photo(photo=image_data, caption=caption)
-                return True
-            else:
-                logger.warning(f"Failed to get image from R2 for meme_id: {meme_id}")
+            # Use same response templates as selector
+            response_texts = ["這張給你！", "希望這張適合你", "找到了！"]
+            caption = random.choice(response_texts)
+            if not await reply_meme_photo(update.message, meme_id, caption):
                 await update.message.reply_text("找不到圖片，請稍後再試！")
                 return False
 
+            telegram_user_id = (
+                update.effective_user.id if update.effective_user else None
+            )
+            if telegram_user_id and user_query_id:
+                from db.query_log import record_selection
+
+                await record_selection(telegram_user_id, meme_id, user_query_id)
+            return True
+
         # Multiple memes: show selection interface
         # Build selection text
         selection_text = "找到以下選項：\n\n"
@@ -219,8 +316,29 @@ async def send_meme_selection(
 
         reply_markup = InlineKeyboardMarkup(keyboard)
 
+        if MEME_PICKER_MODE == "album":
+            # Albums cannot carry buttons, so the list below still follows it
+            try:
+                await send_album_picker(
+                    update.message,
+                    meme_ids,
+                    [f"{idx}. {info}" for idx, info in enumerate(meme_list, start=1)],
+                )
+            except Exception as e:
+                # The album is optional; never lose the buttons over it
+                logger.error(f"Error sending album picker: {e}", exc_info=True)
+
         # Send selection message
-        await update.message.reply_text(selection_text, reply_markup=reply_markup)
+        sent = await update.message.reply_text(
+            selection_text, reply_markup=reply_markup
+        )
+
+        # Fetch the candidates now so the image is ready when one is clicked
+        from bot.prefetch import get_image_prefetcher
+
+        await get_image_prefetcher().prefetch(
+            (sent.chat_id, sent.message_id), sent.get_bot().id, meme_ids
+        )
 
         return True
     except Exception as e:
@@ -245,23 +363,27 @@ async def send_selected_meme(
     Returns:
         True if meme was sent successfully, False otherwise
     """
+    query = update.callback_query
     try:
-        # Get image from R2
-        image_data = await get_image_from_r2(meme_id)
-        if image_data:
-            image_data.seek(0)
-            await update.callback_query.answer("已選擇！")
-            await update.callback_query.message.reply_photo(
-                photo=image_data, caption=caption
-            )
-            return True
-        else:
-            logger.warning(f"Failed to get image from R2 for meme_id: {meme_id}")
-            await update.callback_query.answer(
-                "找不到圖片，請稍後再試！", show_alert=True
-            )
+        # Answer right away; the photo follows (from cache if prefetched)
+        await query.answer("已選擇！")
+        if not query.message:
+            # e.g. the selection message is too old to be accessible
+            logger.warning(f"Selection message unavailable for meme_id: {meme_id}")
             return False
+
+        from bot.prefetch import get_image_prefetcher
+
+        # The other candidates of this selection are no longer needed
+        get_image_prefetcher().release(
+            (query.message.chat_id, query.message.message_id), keep=meme_id
+        )
+        if await reply_meme_photo(query.message, meme_id, caption):
+            return True
+        await query.message.reply_text("找不到圖片，請稍後再試！")
+        return False
     except Exception as e:
         logger.error(f"Error sending selected meme: {e}", exc_info=True)
-        await update.callback_query.answer("發生錯誤，請稍後再試！", show_alert=True)
+        if query.message:
+            await query.message.reply_text("發生錯誤，請稍後再試！")
         return False
@@ -0,0 +1,55 @@
+"""Webhook deployment mode configuration."""
+
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from telegram.ext import Application
+
+load_dotenv()
+
+# "polling" (default) or "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Public HTTPS base URL Telegram posts updates to (e.g. behind a load balancer)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+
+
+def use_webhook() -> bool:
+    """Whether the bot receives updates through a webhook."""
+    return BOT_MODE == "webhook"
+
+
+def run_webhook(
+    application: Application, allowed_updates: Optional[List[str]] = None
+) -> None:
+    """
+    Serve updates on a local HTTP endpoint and register it as the bot webhook.
+
+    Requests without the matching X-Telegram-Bot-Api-Secret-Token header are
+    rejected. Several worker processes can run behind a load balancer with
+    the same WEBHOOK_URL; each one re-registers the same webhook on start.
+
+    Args:
+        application: Bot application
+        allowed_updates: Update types to subscribe to
+    """
+    if not WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL environment variable is not set")
+    if not WEBHOOK_SECRET_TOKEN:
+        raise ValueError("WEBHOOK_SECRET_TOKEN environment variable is not set")
+
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH,
+        webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET_TOKEN,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        allowed_updates=allowed_updates,
+    )
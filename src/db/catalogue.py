@@ -0,0 +1,172 @@
+"""Database operations for catalogue versions and change records."""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from db.connection import SessionLocal, engine
+from db.models import CatalogueChange
+
+logger = logging.getLogger(__name__)
+
+# Channel notified with the new catalogue version when an import commits
+CATALOGUE_CHANNEL = "meme_catalogue"
+
+# Serializes version allocation between concurrent imports
+_VERSION_LOCK_ID = 0x6D656D65
+
+_INSERT_CHANGES_STMT = text(
+    """
+    INSERT INTO catalogue_changes (version, meme_id, deleted, changed_at)
+    SELECT :version, t.meme_id, t.deleted, :now
+    FROM unnest(
+        CAST(:meme_ids AS varchar[]),
+        CAST(:deleted AS boolean[])
+    ) AS t(meme_id, deleted)
+    """
+)
+
+
+def meme_content_hash(name: str, aliases: Optional[List[str]]) -> str:
+    """
+    Hash a meme's name and aliases to detect changes between imports.
+
+    Args:
+        name: Meme name
+        aliases: Meme aliases
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps([name, aliases or []], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_catalogue_changes(
+    db: Session, upserted: Iterable[str], deleted: Iterable[str]
+) -> Optional[int]:
+    """
+    Record changed memes under a new catalogue version, in the caller's transaction.
+
+    Listeners on CATALOGUE_CHANNEL are notified once the transaction commits.
+
+    Args:
+        db: Database session (committed by the caller)
+        upserted: IDs of inserted or updated memes
+        deleted: IDs of deleted memes
+
+    Returns:
+        New catalogue version, or None if nothing changed
+    """
+    changes = {meme_id: False for meme_id in upserted}
+    changes.update({meme_id: True for meme_id in deleted})
+    if not changes:
+        return None
+
+    db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _VERSION_LOCK_ID})
+    version = (
+        db.execute(
+            select(func.coalesce(func.max(CatalogueChange.version), 0))
+        ).scalar_one()
+        + 1
+    )
+    db.execute(
+        _INSERT_CHANGES_STMT,
+        {
+            "version": version,
+            "now": datetime.now(timezone.utc),
+            "meme_ids": list(changes),
+            "deleted": list(changes.values()),
+        },
+    )
+    # Delivered to listeners only when the caller commits
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CATALOGUE_CHANNEL, "payload": str(version)},
+    )
+    return version
+
+
+def open_catalogue_listener() -> Any:
+    """
+    Open a dedicated connection listening on the catalogue channel.
+
+    The connection is detached from the pool since it is held for the whole
+    process lifetime; the caller closes it.
+
+    Returns:
+        psycopg2 connection in autocommit mode; use poll() and notifies
+    """
+    connection = engine.raw_connection()
+    connection.detach()
+    dbapi_connection = connection.dbapi_connection
+    dbapi_connection.autocommit = True
+    with dbapi_connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {CATALOGUE_CHANNEL}")
+    return dbapi_connection
+
+
+def get_latest_catalogue_version() -> Optional[int]:
+    """
+    Get the latest catalogue version.
+
+    Returns:
+        Latest version (0 if nothing was recorded yet), or None on error
+    """
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(func.coalesce(func.max(CatalogueChange.version), 0))
+        ).scalar_one()
+    except Exception as e:
+        logger.error(f"Error getting catalogue version: {e}", exc_info=True)
+        return None
+    finally:
+        db.close()
+
+
+def get_catalogue_changes(since: int) -> Optional[Tuple[int, Set[str], Set[str]]]:
+    """
+    Get memes changed after a catalogue version.
+
+    Args:
+        since: Catalogue version the caller already has
+
+    Returns:
+        Tuple of (latest version, upserted meme IDs, deleted meme IDs), where
+        each meme appears once with its latest change, or None on error
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                CatalogueChange.version,
+                CatalogueChange.meme_id,
+                CatalogueChange.deleted,
+            )
+            .where(CatalogueChange.version > since)
+            .order_by(CatalogueChange.version)
+        ).all()
+    except Exception as e:
+        logger.error(f"Error getting catalogue changes: {e}", exc_info=True)
+        return None
+    finally:
+        db.close()
+
+    latest = since
+    upserted: Set[str] = set()
+    deleted: Set[str] = set()
+    for version, meme_id, is_deleted in rows:
+        latest = version
+        if is_deleted:
+            upserted.discard(meme_id)
+            deleted.add(meme_id)
+        else:
+            deleted.discard(meme_id)
+            upserted.add(meme_id)
+    return (latest, upserted, deleted)
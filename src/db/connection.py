@@ -1,38 +1,156 @@
 """Database connection and session management."""
 
+import asyncio
+import logging
 import os
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Generator, TypeVar
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import Session, sessionmaker
 
-from db.models import Base
+from db.models import EMBEDDING_DIM, Base
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set")
 
+# Connection pool profile
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # Wait for a free conn
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # Seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 5000))  # 0 off
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "spongebob-machine")
+
 # Create engine
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "application_name": DB_APPLICATION_NAME,
+        "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+    },
+)
+
+
+class PoolMetrics:
+    """Connection pool counters collected from SQLAlchemy pool events."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        # Checkouts that took the last idle connection or opened an overflow one
+        self.saturated_checkouts = 0
+        self.peak_checked_out = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.checkouts += 1
+    checked_out = engine.pool.checkedout()  # type: ignore[attr-defined]
+    pool_metrics.peak_checked_out = max(pool_metrics.peak_checked_out, checked_out)
+    if checked_out >= DB_POOL_SIZE:
+        pool_metrics.saturated_checkouts += 1
+        if checked_out >= DB_POOL_SIZE + DB_MAX_OVERFLOW:
+            logger.warning(
+                f"Database pool exhausted ({checked_out} connections in use), "
+                f"further checkouts wait up to {DB_POOL_TIMEOUT}s"
+            )
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.invalidations += 1
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool usage and saturation metrics.
+
+    Returns:
+        Dictionary with current pool state and cumulative counters
+    """
+    pool = engine.pool
+    return {
+        "size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+        "connects": pool_metrics.connects,
+        "checkouts": pool_metrics.checkouts,
+        "invalidations": pool_metrics.invalidations,
+        "saturated_checkouts": pool_metrics.saturated_checkouts,
+        "peak_checked_out": pool_metrics.peak_checked_out,
+    }
+
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Dedicated executor for blocking DB calls made from async handlers, so they
+# neither stall the event loop nor compete with other default-executor work
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", 8))
+db_executor = ThreadPoolExecutor(
+    max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+)
+
+T = TypeVar("T")
+
 
 def init_db():
     """Initialize database tables."""
     # Enable extensions
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         conn.commit()
 
     # Create tables
     Base.metadata.create_all(bind=engine)
 
+    # Columns and indexes create_all does not add to existing tables
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE memes ADD COLUMN IF NOT EXISTS "
+                f"embedding vector({EMBEDDING_DIM})"
+            )
+        )
+        conn.execute(
+            text("ALTER TABLE memes ADD COLUMN IF NOT EXISTS content_hash varchar(64)")
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_memes_embedding_hnsw ON memes "
+                "USING hnsw (embedding vector_cosine_ops)"
+            )
+        )
+        conn.commit()
+
 
 def get_db() -> Generator[Session, None, None]:
     """Get database session."""
@@ -41,3 +159,19 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def run_in_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking database function on the dedicated DB executor.
+
+    Args:
+        func: Synchronous function doing database work
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Return value of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
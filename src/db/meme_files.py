@@ -0,0 +1,109 @@
+"""Database operations for stored Telegram file_ids of meme images."""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from db.connection import SessionLocal
+from db.models import MemeFile
+
+logger = logging.getLogger(__name__)
+
+
+def get_all_file_ids(bot_id: int) -> Optional[Dict[str, str]]:
+    """
+    Get all stored file_ids for a bot.
+
+    Args:
+        bot_id: Telegram bot user ID
+
+    Returns:
+        Dictionary mapping meme_id to file_id, or None on error
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(MemeFile.meme_id, MemeFile.file_id).where(MemeFile.bot_id == bot_id)
+        ).all()
+        return {meme_id: file_id for meme_id, file_id in rows}
+    except Exception as e:
+        logger.error(f"Error loading meme file_ids: {e}", exc_info=True)
+        return None
+    finally:
+        db.close()
+
+
+def save_file_id(
+    bot_id: int, meme_id: str, file_id: str, file_unique_id: Optional[str] = None
+) -> bool:
+    """
+    Store (or replace) the file_id Telegram returned for an uploaded meme.
+
+    Args:
+        bot_id: Telegram bot user ID
+        meme_id: Meme ID
+        file_id: Telegram file_id of the uploaded photo
+        file_unique_id: Telegram file_unique_id of the uploaded photo
+
+    Returns:
+        True if successful, False otherwise
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        stmt = insert(MemeFile).values(
+            meme_id=meme_id,
+            bot_id=bot_id,
+            file_id=file_id,
+            file_unique_id=file_unique_id,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MemeFile.meme_id, MemeFile.bot_id],
+            set_={
+                "file_id": stmt.excluded.file_id,
+                "file_unique_id": stmt.excluded.file_unique_id,
+                "updated_at": now,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+        logger.info(f"Stored file_id for meme {meme_id}")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving meme file_id: {e}", exc_info=True)
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def delete_file_id(bot_id: int, meme_id: str) -> bool:
+    """
+    Delete a stored file_id, e.g. after Telegram rejected it.
+
+    Args:
+        bot_id: Telegram bot user ID
+        meme_id: Meme ID
+
+    Returns:
+        True if successful, False otherwise
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            delete(MemeFile).where(
+                MemeFile.bot_id == bot_id, MemeFile.meme_id == meme_id
+            )
+        )
+        db.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Error deleting meme file_id: {e}", exc_info=True)
+        db.rollback()
+        return False
+    finally:
+        db.close()
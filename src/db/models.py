@@ -1,14 +1,27 @@
 """Database models using SQLAlchemy."""
 
 from datetime import date, datetime, timezone
-from typing import List, Optional
-
-from sqlalchemy import ARRAY, BigInteger, Date, DateTime, ForeignKey, Integer, String
+from typing import Any, List, Optional
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 Base = declarative_base()
 
+# Dimension of meme embeddings (must match the embedding provider)
+EMBEDDING_DIM = 256
+
 
 def utc_now():
     """Get current UTC datetime with timezone awareness."""
@@ -28,6 +41,12 @@ class Meme(Base):  # type: ignore[misc, valid-type]
     aliases: Mapped[Optional[List[str]]] = mapped_column(
         ARRAY(String), nullable=True
     )  # Aliases for search
+    embedding: Mapped[Optional[Any]] = mapped_column(
+        Vector(EMBEDDING_DIM), nullable=True, deferred=True
+    )  # Embedding of name and aliases for semantic search
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True
+    )  # Hash of the imported name and aliases, compared on catalogue sync
 
     def to_dict(self) -> dict:
         """Convert model to dictionary."""
@@ -38,6 +57,60 @@ class Meme(Base):  # type: ignore[misc, valid-type]
         }
 
 
+class MemeFile(Base):  # type: ignore[misc, valid-type]
+    """Telegram file_id of an uploaded meme image, reusable instead of re-uploading."""
+
+    __tablename__ = "meme_files"
+
+    meme_id: Mapped[str] = mapped_column(
+        String(50), ForeignKey("memes.meme_id", ondelete="CASCADE"), primary_key=True
+    )
+    bot_id: Mapped[int] = mapped_column(
+        BigInteger, primary_key=True
+    )  # file_ids are only valid for the bot that uploaded them
+    file_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_unique_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utc_now, onupdate=utc_now
+    )
+
+    def to_dict(self) -> dict:
+        """Convert model to dictionary."""
+        return {
+            "meme_id": self.meme_id,
+            "bot_id": self.bot_id,
+            "file_id": self.file_id,
+            "file_unique_id": self.file_unique_id,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class CatalogueChange(Base):  # type: ignore[misc, valid-type]
+    """Meme changed by a catalogue import, for bots to refresh their caches."""
+
+    __tablename__ = "catalogue_changes"
+
+    version: Mapped[int] = mapped_column(
+        Integer, primary_key=True
+    )  # Catalogue version the change was made in
+    meme_id: Mapped[str] = mapped_column(
+        String(50), primary_key=True
+    )  # No foreign key: deleted memes are recorded too
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utc_now
+    )
+
+    def to_dict(self) -> dict:
+        """Convert model to dictionary."""
+        return {
+            "version": self.version,
+            "meme_id": self.meme_id,
+            "deleted": self.deleted,
+            "changed_at": self.changed_at.isoformat(),
+        }
+
+
 class User(Base):  # type: ignore[misc, valid-type]
     """User model for storing Telegram user information."""
 
@@ -0,0 +1,312 @@
+"""Write-behind logging of user queries and selections in batches."""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Deque, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from db.connection import SessionLocal, run_in_db
+from db.user_queries import update_user_query_selection
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# "sync": write each query before replying, "async": queue and write in batches
+QUERY_LOG_BACKEND = os.getenv("QUERY_LOG_BACKEND", "sync").lower()
+# Pending events kept in memory; new events are dropped (and counted) when full
+QUERY_LOG_QUEUE_SIZE = int(os.getenv("QUERY_LOG_QUEUE_SIZE", 10000))
+QUERY_LOG_BATCH_SIZE = int(os.getenv("QUERY_LOG_BATCH_SIZE", 500))
+QUERY_LOG_FLUSH_INTERVAL = float(os.getenv("QUERY_LOG_FLUSH_INTERVAL", 1))
+# Query ids reserved from the user_queries sequence per round trip
+QUERY_LOG_ID_BLOCK = int(os.getenv("QUERY_LOG_ID_BLOCK", 500))
+
+# ("query", id, telegram_user_id, query_text, created_at)
+# ("selection", user_query_id, telegram_user_id, meme_id, updated_at)
+_Event = Tuple[str, int, int, Optional[str], datetime]
+
+_RESERVE_IDS_STMT = text(
+    "SELECT nextval(pg_get_serial_sequence('user_queries', 'id')) "
+    "FROM generate_series(1, :count)"
+)
+
+_ENSURE_USERS_STMT = text(
+    """
+    INSERT INTO users (
+        telegram_user_id, last_query_time, daily_query_count,
+        last_reset_date, created_at
+    )
+    SELECT DISTINCT t.telegram_user_id, :now, 0, :today, :now
+    FROM unnest(CAST(:telegram_user_ids AS bigint[])) AS t(telegram_user_id)
+    ON CONFLICT (telegram_user_id) DO NOTHING
+    """
+)
+
+_INSERT_QUERIES_STMT = text(
+    """
+    INSERT INTO user_queries (id, user_id, query_text, created_at)
+    SELECT t.id, u.id, t.query_text, t.created_at
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:telegram_user_ids AS bigint[]),
+        CAST(:query_texts AS varchar[]),
+        CAST(:created_ats AS timestamptz[])
+    ) AS t(id, telegram_user_id, query_text, created_at)
+    JOIN users u ON u.telegram_user_id = t.telegram_user_id
+    ON CONFLICT (id) DO NOTHING
+    """
+)
+
+_UPDATE_SELECTIONS_STMT = text(
+    """
+    UPDATE user_queries q
+    SET selected_meme_id = t.meme_id, updated_at = t.updated_at
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:telegram_user_ids AS bigint[]),
+        CAST(:meme_ids AS varchar[]),
+        CAST(:updated_ats AS timestamptz[])
+    ) AS t(id, telegram_user_id, meme_id, updated_at)
+    JOIN users u ON u.telegram_user_id = t.telegram_user_id
+    WHERE q.id = t.id AND q.user_id = u.id
+    """
+)
+
+
+def _reserve_ids(count: int) -> List[int]:
+    """Reserve a block of user_queries ids from the sequence."""
+    db = SessionLocal()
+    try:
+        return list(db.execute(_RESERVE_IDS_STMT, {"count": count}).scalars())
+    finally:
+        db.close()
+
+
+def _write_batch(queries: List[_Event], selections: List[_Event]) -> None:
+    """Write a batch of queries, then the selections, in one transaction."""
+    db = SessionLocal()
+    try:
+        if queries:
+            db.execute(
+                _ENSURE_USERS_STMT,
+                {
+                    "now": datetime.now(timezone.utc),
+                    "today": date.today(),
+                    "telegram_user_ids": [q[2] for q in queries],
+                },
+            )
+            db.execute(
+                _INSERT_QUERIES_STMT,
+                {
+                    "ids": [q[1] for q in queries],
+                    "telegram_user_ids": [q[2] for q in queries],
+                    "query_texts": [q[3] for q in queries],
+                    "created_ats": [q[4] for q in queries],
+                },
+            )
+        if selections:
+            db.execute(
+                _UPDATE_SELECTIONS_STMT,
+                {
+                    "ids": [s[1] for s in selections],
+                    "telegram_user_ids": [s[2] for s in selections],
+                    "meme_ids": [s[3] for s in selections],
+                    "updated_ats": [s[4] for s in selections],
+                },
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class QueryLogWriter:
+    """Bounded queue of query/selection events flushed by a background task."""
+
+    def __init__(
+        self,
+        max_queue: int = QUERY_LOG_QUEUE_SIZE,
+        batch_size: int = QUERY_LOG_BATCH_SIZE,
+        flush_interval: float = QUERY_LOG_FLUSH_INTERVAL,
+        id_block: int = QUERY_LOG_ID_BLOCK,
+    ):
+        """
+        Initialize query log writer.
+
+        Args:
+            max_queue: Maximum number of pending events
+            batch_size: Maximum number of events per database write
+            flush_interval: Seconds to wait for a batch to fill up
+            id_block: Number of query ids reserved per sequence round trip
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.id_block = id_block
+        self._queue: "asyncio.Queue[_Event]" = asyncio.Queue(maxsize=max_queue)
+        self._ids: Deque[int] = deque()
+        self._ids_lock = asyncio.Lock()
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def _next_id(self) -> int:
+        if not self._ids:
+            async with self._ids_lock:
+                if not self._ids:
+                    self._ids.extend(await run_in_db(_reserve_ids, self.id_block))
+        return self._ids.popleft()
+
+    def _enqueue(self, event: _Event) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Analytics must never hold up replies: drop the newest event
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"Query log queue full, dropped {self.dropped} events")
+            return False
+
+    async def log_query(
+        self, telegram_user_id: int, query_text: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Queue a user query and return its pre-assigned ID.
+
+        Args:
+            telegram_user_id: Telegram user ID
+            query_text: User input text (None for /random command)
+
+        Returns:
+            ID the query will be stored under, or None if it was dropped
+        """
+        try:
+            user_query_id = await self._next_id()
+        except Exception as e:
+            logger.error(f"Error reserving user query ids: {e}", exc_info=True)
+            return None
+        event: _Event = (
+            "query",
+            user_query_id,
+            telegram_user_id,
+            query_text[:500] if query_text else query_text,
+            datetime.now(timezone.utc),
+        )
+        return user_query_id if self._enqueue(event) else None
+
+    def log_selection(
+        self, telegram_user_id: int, meme_id: str, user_query_id: int
+    ) -> bool:
+        """
+        Queue the selected meme for a user query.
+
+        Args:
+            telegram_user_id: Telegram user ID
+            meme_id: Selected meme ID
+            user_query_id: User query ID
+
+        Returns:
+            True if queued, False if dropped
+        """
+        now = datetime.now(timezone.utc)
+        return self._enqueue(
+            ("selection", user_query_id, telegram_user_id, meme_id, now)
+        )
+
+    def _drain(self, batch: List[_Event]) -> None:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _flush(self, batch: List[_Event]) -> None:
+        # Queries go first so selections made in the same batch find their row
+        queries = [e for e in batch if e[0] == "query"]
+        selections = [e for e in batch if e[0] == "selection"]
+        try:
+            await run_in_db(_write_batch, queries, selections)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Error writing query log batch: {e}", exc_info=True)
+
+    async def run(self) -> None:
+        """Write queued events in batches until cancelled, then flush the rest."""
+        batch: List[_Event] = []
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                batch.append(await self._queue.get())
+                # Give the batch up to flush_interval to fill, but write a
+                # full batch right away
+                deadline = loop.time() + self.flush_interval
+                self._drain(batch)
+                while len(batch) < self.batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except TimeoutError:
+                        break
+                    self._drain(batch)
+                await self._flush(batch)
+                batch = []
+        finally:
+            # Writes are idempotent, so a batch interrupted mid-flush is redone
+            self._drain(batch)
+            while batch:
+                await self._flush(batch)
+                batch = []
+                self._drain(batch)
+
+
+# Global writer instance
+_writer: Optional[QueryLogWriter] = None
+
+
+def use_async_query_log() -> bool:
+    """Whether user queries are logged through the write-behind queue."""
+    return QUERY_LOG_BACKEND == "async"
+
+
+def get_query_log() -> QueryLogWriter:
+    """Get or create global query log writer."""
+    global _writer
+    if _writer is None:
+        _writer = QueryLogWriter()
+    return _writer
+
+
+async def record_selection(
+    telegram_user_id: int, meme_id: str, user_query_id: Optional[int] = None
+) -> None:
+    """
+    Record the meme a user selected, using the configured logging backend.
+
+    Args:
+        telegram_user_id: Telegram user ID
+        meme_id: Selected meme ID
+        user_query_id: Optional user query ID. If None, the most recent query
+            without a selection is updated directly.
+    """
+    if use_async_query_log() and user_query_id:
+        get_query_log().log_selection(telegram_user_id, meme_id, user_query_id)
+        return
+    await run_in_db(
+        update_user_query_selection,
+        telegram_user_id,
+        meme_id,
+        user_query_id=user_query_id,
+    )
@@ -0,0 +1,287 @@
+"""Daily query rate limiting with a Postgres or in-memory backend."""
+
+import asyncio
+import logging
+import os
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from db.connection import SessionLocal, run_in_db
+from db.query_log import get_query_log, use_async_query_log
+from db.user_queries import (
+    DAILY_QUERY_LIMIT,
+    admit_user_query,
+    check_and_update_rate_limit,
+    rate_limit_message,
+    record_user_query,
+)
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# "postgres": atomic upsert per query, "memory": in-process counters with
+# periodic write-behind to the users table (single bot process only)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "postgres").lower()
+RATE_LIMIT_FLUSH_INTERVAL = float(os.getenv("RATE_LIMIT_FLUSH_INTERVAL", 5))
+RATE_LIMIT_SHARDS = 16
+_FLUSH_BATCH_SIZE = 1000
+
+# Add the pending deltas of many users in one statement
+_FLUSH_STMT = text(
+    """
+    INSERT INTO users AS u (
+        telegram_user_id, last_query_time, daily_query_count,
+        last_reset_date, created_at
+    )
+    SELECT t.telegram_user_id, t.last_query_time, t.delta, t.day, t.last_query_time
+    FROM unnest(
+        CAST(:telegram_user_ids AS bigint[]),
+        CAST(:last_query_times AS timestamptz[]),
+        CAST(:deltas AS integer[]),
+        CAST(:days AS date[])
+    ) AS t(telegram_user_id, last_query_time, delta, day)
+    ON CONFLICT (telegram_user_id) DO UPDATE SET
+        daily_query_count = CASE
+            WHEN u.last_reset_date = EXCLUDED.last_reset_date
+            THEN u.daily_query_count + EXCLUDED.daily_query_count
+            ELSE EXCLUDED.daily_query_count
+        END,
+        last_reset_date = EXCLUDED.last_reset_date,
+        last_query_time = GREATEST(u.last_query_time, EXCLUDED.last_query_time)
+    """
+)
+
+
+class _Counter:
+    """Per-user daily counter plus the part not yet written to the database."""
+
+    __slots__ = ("day", "count", "pending", "last_query_time")
+
+    def __init__(self, day: date, count: int = 0):
+        self.day = day
+        self.count = count
+        self.pending = 0
+        self.last_query_time: Optional[datetime] = None
+
+
+class InMemoryRateLimiter:
+    """Sharded in-process daily query counters keyed by Telegram user ID."""
+
+    def __init__(self, limit: int = DAILY_QUERY_LIMIT, shards: int = RATE_LIMIT_SHARDS):
+        """
+        Initialize rate limiter.
+
+        Args:
+            limit: Daily query limit per user
+            shards: Number of independently locked counter shards
+        """
+        self.limit = limit
+        self._shards: List[Tuple[threading.Lock, Dict[int, _Counter]]] = [
+            (threading.Lock(), {}) for _ in range(shards)
+        ]
+
+    def _shard(
+        self, telegram_user_id: int
+    ) -> Tuple[threading.Lock, Dict[int, _Counter]]:
+        return self._shards[telegram_user_id % len(self._shards)]
+
+    def load(self) -> int:
+        """
+        Seed today's counters from the users table.
+
+        Returns:
+            Number of users loaded
+        """
+        today = date.today()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                text(
+                    "SELECT telegram_user_id, daily_query_count FROM users "
+                    "WHERE last_reset_date = :today"
+                ),
+                {"today": today},
+            ).all()
+        finally:
+            db.close()
+
+        for telegram_user_id, count in rows:
+            lock, counters = self._shard(telegram_user_id)
+            with lock:
+                counter = counters.get(telegram_user_id)
+                if counter is None:
+                    counters[telegram_user_id] = _Counter(today, count)
+                else:
+                    counter.count += count
+        logger.info(f"Loaded rate limit counters for {len(rows)} users")
+        return len(rows)
+
+    def check(self, telegram_user_id: int) -> Tuple[bool, Optional[str]]:
+        """
+        Check if user has exceeded daily query limit and update count.
+
+        Args:
+            telegram_user_id: Telegram user ID
+
+        Returns:
+            Tuple of (is_allowed, error_message)
+        """
+        today = date.today()
+        lock, counters = self._shard(telegram_user_id)
+        with lock:
+            counter = counters.get(telegram_user_id)
+            if counter is None:
+                counter = counters[telegram_user_id] = _Counter(today)
+            elif counter.day != today:
+                # Yesterday's unflushed count no longer matters for the limit
+                counter.day = today
+                counter.count = 0
+                counter.pending = 0
+
+            if counter.count >= self.limit:
+                return (False, rate_limit_message())
+
+            counter.count += 1
+            counter.pending += 1
+            counter.last_query_time = datetime.now(timezone.utc)
+        return (True, None)
+
+    def _take_pending(self) -> List[Tuple[int, datetime, int, date]]:
+        today = date.today()
+        pending = []
+        for lock, counters in self._shards:
+            with lock:
+                for telegram_user_id, counter in list(counters.items()):
+                    if counter.day != today and not counter.pending:
+                        # A past day that was fully flushed: forget the user
+                        del counters[telegram_user_id]
+                        continue
+                    if counter.pending and counter.last_query_time:
+                        pending.append(
+                            (
+                                telegram_user_id,
+                                counter.last_query_time,
+                                counter.pending,
+                                counter.day,
+                            )
+                        )
+                        counter.pending = 0
+        return pending
+
+    def _restore_pending(self, rows: List[Tuple[int, datetime, int, date]]) -> None:
+        for telegram_user_id, _, delta, day in rows:
+            lock, counters = self._shard(telegram_user_id)
+            with lock:
+                counter = counters.get(telegram_user_id)
+                if counter is not None and counter.day == day:
+                    counter.pending += delta
+
+    def flush(self) -> int:
+        """
+        Write pending counts to the users table in batches.
+
+        Counts that fail to write are kept and retried on the next flush.
+
+        Returns:
+            Number of users written
+        """
+        pending = self._take_pending()
+        if not pending:
+            return 0
+
+        written = 0
+        db = SessionLocal()
+        try:
+            for i in range(0, len(pending), _FLUSH_BATCH_SIZE):
+                batch = pending[i : i + _FLUSH_BATCH_SIZE]
+                db.execute(
+                    _FLUSH_STMT,
+                    {
+                        "telegram_user_ids": [row[0] for row in batch],
+                        "last_query_times": [row[1] for row in batch],
+                        "deltas": [row[2] for row in batch],
+                        "days": [row[3] for row in batch],
+                    },
+                )
+                db.commit()
+                written += len(batch)
+        except Exception as e:
+            logger.error(f"Error flushing rate limit counters: {e}", exc_info=True)
+            db.rollback()
+            self._restore_pending(pending[written:])
+        finally:
+            db.close()
+
+        logger.debug(f"Flushed rate limit counters for {written} users")
+        return written
+
+
+# Global limiter instance
+_limiter: Optional[InMemoryRateLimiter] = None
+
+
+def use_memory_rate_limit() -> bool:
+    """Whether rate limiting is decided by the in-memory limiter."""
+    return RATE_LIMIT_BACKEND == "memory"
+
+
+def get_rate_limiter() -> InMemoryRateLimiter:
+    """Get or create global in-memory rate limiter."""
+    global _limiter
+    if _limiter is None:
+        _limiter = InMemoryRateLimiter()
+    return _limiter
+
+
+async def admit_query(
+    telegram_user_id: int, query_text: Optional[str] = None
+) -> Tuple[bool, Optional[str], Optional[int]]:
+    """
+    Apply the rate limit and record the user query using the configured backend.
+
+    Args:
+        telegram_user_id: Telegram user ID
+        query_text: User input text (None for /random command)
+
+    Returns:
+        Tuple of (is_allowed, error_message, user_query_id)
+    """
+    if not use_memory_rate_limit() and not use_async_query_log():
+        # Rate limit and query insert share one statement
+        return await run_in_db(admit_user_query, telegram_user_id, query_text)
+
+    if use_memory_rate_limit():
+        is_allowed, error_msg = get_rate_limiter().check(telegram_user_id)
+    else:
+        is_allowed, error_msg = await run_in_db(
+            check_and_update_rate_limit, telegram_user_id
+        )
+    if not is_allowed:
+        return (False, error_msg, None)
+
+    if use_async_query_log():
+        user_query_id = await get_query_log().log_query(telegram_user_id, query_text)
+    else:
+        user_query_id = await run_in_db(record_user_query, telegram_user_id, query_text)
+    return (True, None, user_query_id)
+
+
+async def run_rate_limit_flusher(interval: float = RATE_LIMIT_FLUSH_INTERVAL) -> None:
+    """
+    Periodically flush in-memory counters until cancelled, then flush once more.
+
+    Args:
+        interval: Seconds between flushes
+    """
+    limiter = get_rate_limiter()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await run_in_db(limiter.flush)
+    finally:
+        await run_in_db(limiter.flush)
@@ -6,6 +6,7 @@ import os
 from typing import Optional, Tuple
 
 from dotenv import load_dotenv
+from sqlalchemy import text
 
 from db.connection import SessionLocal
 from db.models import User, UserQuery
@@ -18,6 +19,58 @@ load_dotenv()
 DAILY_QUERY_LIMIT = int(os.getenv("DAILY_QUERY_LIMIT", 100))
 
 
+# Create the user, roll the day over and count the query in one statement.
+# The WHERE clause skips the update once the limit is reached, so no row is
+# returned for a denied query. New users start at 0 like before.
+_RATE_LIMIT_UPSERT = """
+    INSERT INTO users (
+        telegram_user_id, last_query_time, daily_query_count,
+        last_reset_date, created_at
+    )
+    VALUES (:telegram_user_id, :now, 0, :today, :now)
+    ON CONFLICT (telegram_user_id) DO UPDATE SET
+        daily_query_count = CASE
+            WHEN users.last_reset_date IS DISTINCT FROM EXCLUDED.last_reset_date
+            THEN 1
+            ELSE users.daily_query_count + 1
+        END,
+        last_reset_date = EXCLUDED.last_reset_date,
+        last_query_time = EXCLUDED.last_query_time
+    WHERE users.last_reset_date IS DISTINCT FROM EXCLUDED.last_reset_date
+       OR users.daily_query_count < :limit
+    RETURNING id, daily_query_count
+"""
+
+_RATE_LIMIT_STMT = text(_RATE_LIMIT_UPSERT)
+
+_ADMIT_QUERY_STMT = text(
+    f"""
+    WITH admitted AS ({_RATE_LIMIT_UPSERT}),
+    logged AS (
+        INSERT INTO user_queries (user_id, query_text, created_at)
+        SELECT id, :query_text, :now FROM admitted
+        RETURNING id, user_id
+    )
+    SELECT admitted.daily_query_count, logged.id AS user_query_id
+    FROM admitted LEFT JOIN logged ON logged.user_id = admitted.id
+    """
+)
+
+
+def _rate_limit_params(telegram_user_id: int) -> dict:
+    return {
+        "telegram_user_id": telegram_user_id,
+        "now": datetime.now(timezone.utc),
+        "today": date.today(),
+        "limit": DAILY_QUERY_LIMIT,
+    }
+
+
+def rate_limit_message() -> str:
+    """Message shown when the daily query limit is reached."""
+    return f"今日查詢次數已達上限（{DAILY_QUERY_LIMIT} 次），請明天再試！"
+
+
 def check_and_update_rate_limit(telegram_user_id: int) -> Tuple[bool, Optional[str]]:
     """
     Check if user has exceeded daily query limit and update count.
@@ -32,44 +85,16 @@ def check_and_update_rate_limit(telegram_user_id: int) -> Tuple[bool, Optional[s
     """
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.telegram_user_id == telegram_user_id).first()
-        today = date.today()
-
-        if not user:
-            # New user, create with today's date
-            user = User(
-                telegram_user_id=telegram_user_id,
-                last_query_time=datetime.now(timezone.utc),
-                daily_query_count=0,
-                last_reset_date=today,
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-            return (True, None)
-
-        # Check if we need to reset the counter (new day)
-        if user.last_reset_date != today:
-            user.daily_query_count = 0
-            user.last_reset_date = today
-
-        # Check if limit exceeded
-        if user.daily_query_count >= DAILY_QUERY_LIMIT:
-            remaining = DAILY_QUERY_LIMIT - user.daily_query_count
-            error_msg = f"今日查詢次數已達上限（{DAILY_QUERY_LIMIT} 次），請明天再試！"
-            return (False, error_msg)
-
-        # Increment counter
-        user.daily_query_count += 1
-        user.last_query_time = datetime.now(timezone.utc)
+        row = db.execute(_RATE_LIMIT_STMT, _rate_limit_params(telegram_user_id)).first()
         db.commit()
-        db.refresh(user)
 
-        remaining = DAILY_QUERY_LIMIT - user.daily_query_count
+        if row is None:
+            return (False, rate_limit_message())
+
+        remaining = DAILY_QUERY_LIMIT - row.daily_query_count
         logger.info(
-            f"User {telegram_user_id} query count: {user.daily_query_count}/{DAILY_QUERY_LIMIT} (remaining: {remaining})"
+            f"User {telegram_user_id} query count: {row.daily_query_count}/{DAILY_QUERY_LIMIT} (remaining: {remaining})"
         )
-
         return (True, None)
     except Exception as e:
         logger.error(f"Error checking rate limit: {e}", exc_info=True)
@@ -80,6 +105,106 @@ def check_and_update_rate_limit(telegram_user_id: int) -> Tuple[bool, Optional[s
         db.close()
 
 
+def admit_user_query(
+    telegram_user_id: int, query_text: Optional[str] = None
+) -> Tuple[bool, Optional[str], Optional[int]]:
+    """
+    Apply the rate limit and record the user query in a single statement.
+
+    Equivalent to check_and_update_rate_limit followed by create_user_query,
+    but done in one round trip and one transaction.
+
+    Args:
+        telegram_user_id: Telegram user ID
+        query_text: User input text (None for /random command)
+
+    Returns:
+        Tuple of (is_allowed, error_message, user_query_id)
+        - is_allowed: True if user can make query, False if limit exceeded
+        - error_message: Error message if limit exceeded, None otherwise
+        - user_query_id: ID of the created user query, None if not created
+    """
+    db = SessionLocal()
+    try:
+        params = _rate_limit_params(telegram_user_id)
+        # Keep within UserQuery.query_text so long messages can't skip the limit
+        params["query_text"] = query_text[:500] if query_text else query_text
+        row = db.execute(_ADMIT_QUERY_STMT, params).first()
+        db.commit()
+
+        if row is None:
+            return (False, rate_limit_message(), None)
+
+        remaining = DAILY_QUERY_LIMIT - row.daily_query_count
+        logger.info(
+            f"User {telegram_user_id} query count: {row.daily_query_count}/{DAILY_QUERY_LIMIT} (remaining: {remaining})"
+        )
+        return (True, None, row.user_query_id)
+    except Exception as e:
+        logger.error(f"Error admitting user query: {e}", exc_info=True)
+        db.rollback()
+        # On error, allow the query to proceed (fail open)
+        return (True, None, None)
+    finally:
+        db.close()
+
+
+_RECORD_QUERY_STMT = text(
+    """
+    WITH ensured AS (
+        INSERT INTO users (
+            telegram_user_id, last_query_time, daily_query_count,
+            last_reset_date, created_at
+        )
+        VALUES (:telegram_user_id, :now, 0, :today, :now)
+        ON CONFLICT (telegram_user_id) DO UPDATE
+            SET telegram_user_id = EXCLUDED.telegram_user_id
+        RETURNING id
+    )
+    INSERT INTO user_queries (user_id, query_text, created_at)
+    SELECT id, :query_text, :now FROM ensured
+    RETURNING id
+    """
+)
+
+
+def record_user_query(
+    telegram_user_id: int, query_text: Optional[str] = None
+) -> Optional[int]:
+    """
+    Record a user query without touching the rate limit counters.
+
+    Creates the user if needed, so it also works when the rate limit is kept
+    in memory and the user row has not been written yet.
+
+    Args:
+        telegram_user_id: Telegram user ID
+        query_text: User input text (None for /random command)
+
+    Returns:
+        ID of the created user query, or None if error
+    """
+    db = SessionLocal()
+    try:
+        user_query_id = db.execute(
+            _RECORD_QUERY_STMT,
+            {
+                "telegram_user_id": telegram_user_id,
+                "now": datetime.now(timezone.utc),
+                "today": date.today(),
+                "query_text": query_text[:500] if query_text else query_text,
+            },
+        ).scalar_one()
+        db.commit()
+        return user_query_id
+    except Exception as e:
+        logger.error(f"Error recording user query: {e}", exc_info=True)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+
 def get_or_create_user(telegram_user_id: int) -> User:
     """
     Get or create a user by Telegram user ID.
@@ -0,0 +1,29 @@
+"""Process-wide meme catalogue version used to stamp cached search data."""
+
+import threading
+
+_version = 0
+_lock = threading.Lock()
+
+
+def get_catalogue_version() -> int:
+    """Get the catalogue version this process currently serves."""
+    return _version
+
+
+def set_catalogue_version(version: int) -> bool:
+    """
+    Set the catalogue version, e.g. after the catalogue was re-imported.
+
+    Args:
+        version: New catalogue version
+
+    Returns:
+        True if the version changed
+    """
+    global _version
+    with _lock:
+        if version == _version:
+            return False
+        _version = version
+        return True
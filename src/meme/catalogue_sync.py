@@ -0,0 +1,144 @@
+"""Keep in-process meme caches in step with catalogue imports."""
+
+import asyncio
+import logging
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from db.catalogue import (
+    get_catalogue_changes,
+    get_latest_catalogue_version,
+    open_catalogue_listener,
+)
+from db.connection import run_in_db
+from meme.catalogue import get_catalogue_version, set_catalogue_version
+from meme.dataset import get_dataset
+from meme.random_pool import get_random_pool
+from meme.search_index import apply_search_index_changes
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between catalogue version checks (0 disables polling)
+CATALOGUE_POLL_INTERVAL = float(os.getenv("CATALOGUE_POLL_INTERVAL", 30))
+# Apply imports as soon as they commit via LISTEN/NOTIFY
+CATALOGUE_LISTEN = os.getenv("CATALOGUE_LISTEN", "true").lower() == "true"
+# Seconds before a lost listener connection is reopened
+CATALOGUE_LISTEN_RETRY = float(os.getenv("CATALOGUE_LISTEN_RETRY", 5))
+
+# Poller and listener may both notice a version; apply it once
+_sync_lock = threading.Lock()
+
+
+def load_catalogue_version() -> int:
+    """
+    Start serving the latest catalogue version, before any cache is built.
+
+    Returns:
+        Catalogue version now served
+    """
+    version = get_latest_catalogue_version()
+    if version is not None:
+        set_catalogue_version(version)
+    return get_catalogue_version()
+
+
+def sync_catalogue() -> bool:
+    """
+    Apply catalogue changes made since the served version to in-process caches.
+
+    Changed memes are reloaded and swapped into the search index and random
+    pool; bumping the served version expires cached search results.
+
+    Returns:
+        True if a newer catalogue version was applied
+    """
+    with _sync_lock:
+        return _sync_catalogue()
+
+
+def _sync_catalogue() -> bool:
+    current = get_catalogue_version()
+    changes = get_catalogue_changes(current)
+    if changes is None:
+        return False
+    version, upserted, deleted = changes
+    if version <= current:
+        return False
+
+    rows = get_dataset().get_alias_rows(sorted(upserted)) if upserted else []
+    if upserted and not rows:
+        # Most likely a database error; try again on the next check
+        logger.warning(f"Could not load memes changed in catalogue v{version}")
+        return False
+    # Memes deleted again after the change was recorded
+    deleted |= upserted - {row["meme_id"] for row in rows}
+
+    apply_search_index_changes(rows, deleted)
+    get_random_pool().apply_changes(rows, deleted)
+    set_catalogue_version(version)
+    logger.info(
+        f"Applied catalogue v{version}: {len(rows)} memes updated, "
+        f"{len(deleted)} deleted"
+    )
+    return True
+
+
+async def run_catalogue_poller(interval: float = CATALOGUE_POLL_INTERVAL) -> None:
+    """
+    Check for catalogue changes every interval seconds until cancelled.
+
+    Args:
+        interval: Seconds between checks
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_db(sync_catalogue)
+        except Exception as e:
+            logger.error(f"Error syncing catalogue: {e}", exc_info=True)
+
+
+async def _listen(loop: asyncio.AbstractEventLoop) -> None:
+    """Apply catalogue changes whenever a notification arrives on a connection."""
+    connection = await run_in_db(open_catalogue_listener)
+    readable = asyncio.Event()
+    loop.add_reader(connection.fileno(), readable.set)
+    try:
+        logger.info("Listening for catalogue changes")
+        # Catch up on imports committed while no listener was open
+        await run_in_db(sync_catalogue)
+        while True:
+            await readable.wait()
+            readable.clear()
+            connection.poll()  # Raises if the connection was lost
+            if connection.notifies:
+                connection.notifies.clear()
+                await run_in_db(sync_catalogue)
+    finally:
+        loop.remove_reader(connection.fileno())
+        connection.close()
+
+
+async def run_catalogue_listener(retry: float = CATALOGUE_LISTEN_RETRY) -> None:
+    """
+    Apply catalogue changes as soon as imports commit, until cancelled.
+
+    Notifications only say that a new version exists; the changes themselves
+    are read from the database, so missed notifications are caught up on.
+
+    Args:
+        retry: Seconds before reconnecting after the connection is lost
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await _listen(loop)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Catalogue listener failed, reconnecting: {e}")
+        await asyncio.sleep(retry)
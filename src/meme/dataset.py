@@ -3,11 +3,11 @@
 import logging
 from typing import List, Dict, Optional
 
-from sqlalchemy import select, text
-from sqlalchemy.orm import Session
+from sqlalchemy import ARRAY, Executable, String, any_, literal, select, text
 
-from db.connection import SessionLocal
+from db.connection import engine
 from db.models import Meme
+from meme.embeddings import get_embedding_provider, vector_literal
 
 logger = logging.getLogger(__name__)
 
@@ -15,34 +15,71 @@ logger = logging.getLogger(__name__)
 class MemeDataset:
     """Manages meme metadata and dataset operations from database."""
 
-    def __init__(self):
-        """Initialize meme dataset from database."""
-        self.db: Optional[Session] = None
+    def _fetch_all(self, stmt: Executable, params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Run a read-only query on a pooled connection checked out for this call.
+
+        No ORM session is kept between calls, so queries from several executor
+        threads never share a connection and a failed query can't leave a
+        broken transaction behind (the connection is rolled back on return).
+
+        Args:
+            stmt: Statement to execute
+            params: Bound parameters
 
-    def _get_db(self) -> Session:
-        """Get database session."""
-        if self.db is None:
-            self.db = SessionLocal()
-        return self.db
+        Returns:
+            List of row dictionaries
+        """
+        with engine.connect() as conn:
+            return [dict(row) for row in conn.execute(stmt, params or {}).mappings()]
 
     def get_all_memes(self) -> List[Dict]:
         """Get all memes from database."""
-        db = self._get_db()
         try:
-            memes = db.execute(select(Meme)).scalars().all()
-            return [meme.to_dict() for meme in memes]
+            rows = self._fetch_all(select(Meme.meme_id, Meme.name, Meme.aliases))
+            return [{**row, "aliases": row["aliases"] or []} for row in rows]
         except Exception as e:
             logger.error(f"Error loading memes from database: {e}")
             return []
 
+    def get_alias_rows(self, meme_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get id, meme_id, name and aliases of memes for in-memory indexing.
+
+        Args:
+            meme_ids: Only load these memes (default: every meme)
+
+        Returns:
+            List of meme dictionaries, empty list on error
+        """
+        stmt = select(Meme.id, Meme.meme_id, Meme.name, Meme.aliases)
+        if meme_ids is not None:
+            stmt = stmt.where(Meme.meme_id == any_(literal(meme_ids, ARRAY(String))))
+        try:
+            return self._fetch_all(stmt)
+        except Exception as e:
+            logger.error(f"Error loading meme aliases from database: {e}")
+            return []
+
+    def get_pool_rows(self) -> List[Dict]:
+        """Get meme_id and name of every meme for random selection."""
+        try:
+            return self._fetch_all(select(Meme.meme_id, Meme.name))
+        except Exception as e:
+            logger.error(f"Error loading meme pool from database: {e}")
+            return []
+
     def get_meme_by_id(self, meme_id: str) -> Optional[Dict]:
         """Get meme by ID."""
-        db = self._get_db()
         try:
-            meme = db.execute(
-                select(Meme).where(Meme.meme_id == meme_id)
-            ).scalar_one_or_none()
-            return meme.to_dict() if meme else None
+            rows = self._fetch_all(
+                select(Meme.meme_id, Meme.name, Meme.aliases).where(
+                    Meme.meme_id == meme_id
+                )
+            )
+            if not rows:
+                return None
+            return {**rows[0], "aliases": rows[0]["aliases"] or []}
         except Exception as e:
             logger.error(f"Error getting meme by ID: {e}")
             return None
@@ -58,11 +95,10 @@ class MemeDataset:
         Returns:
             List of meme dictionaries, empty list if none found
         """
-        db = self._get_db()
         try:
             stmt = text(
                 """
-                SELECT m.*,
+                SELECT m.id, m.meme_id, m.name, m.aliases,
                   MAX(similarity(a, :query)) AS score
                 FROM memes m,
                      unnest(m.aliases) AS a
@@ -72,14 +108,133 @@ class MemeDataset:
                 LIMIT :limit
                 """
             )
-            results = (
-                db.execute(stmt, {"query": query, "limit": limit}).mappings().all()
-            )
-            return [dict(result) for result in results]
+            return self._fetch_all(stmt, {"query": query, "limit": limit})
         except Exception as e:
             logger.error(f"Alias search error: {e}")
             return []
 
+    def search_by_embedding(
+        self, query: str, limit: int = 1, min_score: float = 0.0
+    ) -> List[Dict]:
+        """
+        Search memes by embedding cosine similarity using the pgvector index.
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return (default: 1)
+            min_score: Minimum cosine similarity of returned memes
+
+        Returns:
+            List of meme dictionaries, empty list if none found
+        """
+        try:
+            vector = get_embedding_provider().embed([query])[0]
+            stmt = text(
+                """
+                SELECT * FROM (
+                    SELECT m.id, m.meme_id, m.name, m.aliases,
+                      1 - (m.embedding <=> CAST(:vector AS vector)) AS score
+                    FROM memes m
+                    WHERE m.embedding IS NOT NULL
+                    ORDER BY m.embedding <=> CAST(:vector AS vector)
+                    LIMIT :limit
+                ) nearest
+                WHERE score >= :min_score
+                """
+            )
+            return self._fetch_all(
+                stmt,
+                {
+                    "vector": vector_literal(vector),
+                    "limit": limit,
+                    "min_score": min_score,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Embedding search error: {e}")
+            return []
+
+    def search_hybrid(
+        self,
+        query: str,
+        limit: int = 1,
+        min_vector_score: float = 0.0,
+        rrf_k: int = 60,
+        candidates: int = 20,
+    ) -> List[Dict]:
+        """
+        Search memes by trigram and embedding similarity, fused in one query.
+
+        Both candidate lists are ranked separately and combined with
+        reciprocal-rank fusion: score = sum of 1 / (rrf_k + rank).
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return (default: 1)
+            min_vector_score: Minimum cosine similarity of vector candidates
+            rrf_k: Reciprocal-rank fusion constant
+            candidates: Number of candidates taken from each search
+
+        Returns:
+            List of meme dictionaries, empty list if none found
+        """
+        try:
+            vector = get_embedding_provider().embed([query])[0]
+            stmt = text(
+                """
+                WITH trgm AS (
+                    SELECT m.id, MAX(similarity(a, :query)) AS score
+                    FROM memes m,
+                         unnest(m.aliases) AS a
+                    GROUP BY m.id
+                    HAVING MAX(similarity(a, :query)) > 0.3
+                    ORDER BY score DESC
+                    LIMIT :candidates
+                ),
+                trgm_ranked AS (
+                    SELECT id, score, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank
+                    FROM trgm
+                ),
+                vec AS (
+                    SELECT m.id,
+                      1 - (m.embedding <=> CAST(:vector AS vector)) AS score
+                    FROM memes m
+                    WHERE m.embedding IS NOT NULL
+                    ORDER BY m.embedding <=> CAST(:vector AS vector)
+                    LIMIT :candidates
+                ),
+                vec_ranked AS (
+                    SELECT id, score, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank
+                    FROM vec
+                    WHERE score >= :min_vector_score
+                )
+                SELECT m.id, m.meme_id, m.name, m.aliases,
+                  COALESCE(1.0 / (:rrf_k + t.rank), 0)
+                    + COALESCE(1.0 / (:rrf_k + v.rank), 0) AS score,
+                  t.score AS trigram_score,
+                  v.score AS vector_score
+                FROM trgm_ranked t
+                FULL OUTER JOIN vec_ranked v ON v.id = t.id
+                JOIN memes m ON m.id = COALESCE(t.id, v.id)
+                ORDER BY score DESC
+                LIMIT :limit
+                """
+            )
+            return self._fetch_all(
+                stmt,
+                {
+                    "query": query,
+                    "vector": vector_literal(vector),
+                    "limit": limit,
+                    "min_vector_score": min_vector_score,
+                    "rrf_k": rrf_k,
+                    "candidates": max(candidates, limit),
+                },
+            )
+        except Exception as e:
+            logger.error(f"Hybrid search error: {e}")
+            return []
+
 
 # Global dataset instance
 _dataset: Optional[MemeDataset] = None
@@ -0,0 +1,138 @@
+"""Embedding providers for semantic meme search."""
+
+import hashlib
+import logging
+import os
+import unicodedata
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from db.models import EMBEDDING_DIM
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "hashing": deterministic local character n-gram vectors, "openai": OpenAI API
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "hashing").lower()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+class EmbeddingProvider(Protocol):
+    """Turns texts into L2-normalized vectors of a fixed dimension."""
+
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), dim) float32 array."""
+        ...
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbeddingProvider:
+    """Deterministic embeddings from hashed character n-grams, no network needed."""
+
+    def __init__(
+        self, dim: int = EMBEDDING_DIM, ngram_sizes: Sequence[int] = (1, 2, 3)
+    ):
+        """
+        Initialize hashing embedding provider.
+
+        Args:
+            dim: Vector dimension
+            ngram_sizes: Character n-gram lengths to hash
+        """
+        self.dim = dim
+        self.ngram_sizes = tuple(ngram_sizes)
+
+    def _bucket(self, ngram: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(ngram.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        # Low bits pick the bucket, one more bit picks the sign
+        return value % self.dim, 1.0 if (value >> 32) & 1 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), dim) float32 array."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            normalized = unicodedata.normalize("NFKC", text).casefold()
+            for token in normalized.split():
+                for size in self.ngram_sizes:
+                    for i in range(len(token) - size + 1):
+                        bucket, sign = self._bucket(token[i : i + size])
+                        vectors[row, bucket] += sign
+        return _normalize_rows(vectors)
+
+
+class OpenAIEmbeddingProvider:
+    """Embeddings from the OpenAI embeddings API."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, model: str = OPENAI_EMBEDDING_MODEL):
+        """
+        Initialize OpenAI embedding provider.
+
+        Args:
+            dim: Vector dimension requested from the API
+            model: OpenAI embedding model
+        """
+        from openai import OpenAI
+
+        self.dim = dim
+        self.model = model
+        self._client = OpenAI(api_key=OPENAI_API_KEY)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), dim) float32 array."""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        response = self._client.embeddings.create(
+            model=self.model, input=list(texts), dimensions=self.dim
+        )
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        return _normalize_rows(vectors)
+
+
+def meme_text(name: str, aliases: Optional[List[str]]) -> str:
+    """
+    Build the text embedded for a meme.
+
+    Args:
+        name: Meme name
+        aliases: Meme aliases
+
+    Returns:
+        Name and aliases joined by spaces
+    """
+    return " ".join([name, *(aliases or [])])
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    """Format a vector as a pgvector text literal, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(f"{x:.6g}" for x in vector.tolist()) + "]"
+
+
+# Global provider instance
+_provider: Optional[EmbeddingProvider] = None
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """Get or create the configured embedding provider."""
+    global _provider
+    if _provider is None:
+        if EMBEDDING_PROVIDER == "openai":
+            _provider = OpenAIEmbeddingProvider()
+        else:
+            if EMBEDDING_PROVIDER != "hashing":
+                logger.warning(
+                    f"Unknown EMBEDDING_PROVIDER {EMBEDDING_PROVIDER!r}, using hashing"
+                )
+            _provider = HashingEmbeddingProvider()
+    return _provider
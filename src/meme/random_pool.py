@@ -0,0 +1,117 @@
+"""Cached pool of meme ids and names for random selection."""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from meme.dataset import get_dataset
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the pool is reloaded from the database
+RANDOM_POOL_TTL = float(os.getenv("RANDOM_POOL_TTL", 300))
+
+
+class RandomPool:
+    """Array-backed snapshot of the catalogue with O(k) random sampling."""
+
+    def __init__(self, ttl: float = RANDOM_POOL_TTL):
+        """
+        Initialize random pool.
+
+        Args:
+            ttl: Seconds before the snapshot is reloaded
+        """
+        self.ttl = ttl
+        # (meme_ids, names, loaded_at), swapped as a whole on reload
+        self._snapshot: Optional[Tuple[Tuple[str, ...], Tuple[str, ...], float]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        rows = get_dataset().get_pool_rows()
+        if not rows and self._snapshot is not None:
+            # Keep serving the previous snapshot if the reload failed
+            logger.warning("Random pool reload returned no memes, keeping old pool")
+            return
+        meme_ids = tuple(row["meme_id"] for row in rows)
+        names = tuple(row["name"] for row in rows)
+        # An empty pool is retried on the next call instead of cached
+        loaded_at = time.monotonic() if rows else float("-inf")
+        self._snapshot = (meme_ids, names, loaded_at)
+        logger.info(f"Loaded random pool with {len(meme_ids)} memes")
+
+    def _get_snapshot(self) -> Tuple[Tuple[str, ...], Tuple[str, ...], float]:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot[2] > self.ttl:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._load()
+            snapshot = self._snapshot
+        assert snapshot is not None
+        return snapshot
+
+    def sample(self, count: int) -> List[Dict]:
+        """
+        Sample distinct random memes.
+
+        Args:
+            count: Number of memes to return
+
+        Returns:
+            List of meme dictionaries with meme_id and name
+        """
+        meme_ids, names, _ = self._get_snapshot()
+        positions = random.sample(range(len(meme_ids)), min(count, len(meme_ids)))
+        return [{"meme_id": meme_ids[pos], "name": names[pos]} for pos in positions]
+
+    def apply_changes(self, upserted: List[Dict], deleted_ids: Set[str]) -> None:
+        """
+        Swap in a snapshot with changed memes applied, if one was loaded.
+
+        Args:
+            upserted: New or updated memes with meme_id and name
+            deleted_ids: meme_ids of removed memes
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        meme_ids, names, loaded_at = snapshot
+        changed = deleted_ids | {row["meme_id"] for row in upserted}
+        kept = [pos for pos, meme_id in enumerate(meme_ids) if meme_id not in changed]
+        updated = (
+            tuple(meme_ids[pos] for pos in kept)
+            + tuple(row["meme_id"] for row in upserted),
+            tuple(names[pos] for pos in kept) + tuple(row["name"] for row in upserted),
+            loaded_at,
+        )
+        with self._lock:
+            # A snapshot reloaded in the meantime already has the changes
+            if self._snapshot is snapshot:
+                self._snapshot = updated
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next sample reloads the catalogue."""
+        with self._lock:
+            if self._snapshot is not None:
+                meme_ids, names, _ = self._snapshot
+                # Expire but keep it as a fallback if the reload fails
+                self._snapshot = (meme_ids, names, float("-inf"))
+
+
+# Global pool instance
+_pool: Optional[RandomPool] = None
+
+
+def get_random_pool() -> RandomPool:
+    """Get or create global random pool."""
+    global _pool
+    if _pool is None:
+        _pool = RandomPool()
+    return _pool
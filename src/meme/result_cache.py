@@ -0,0 +1,142 @@
+"""LRU cache of meme search results keyed by normalized user text."""
+
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from meme.catalogue import get_catalogue_version
+
+load_dotenv()
+
+# Maximum cached queries (0 disables the cache) and seconds an entry stays valid
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 300))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize user text for searching and caching.
+
+    Applies NFKC (which also folds full-width characters), case folding and
+    whitespace collapsing.
+
+    Args:
+        text: User input text
+
+    Returns:
+        Normalized text
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class ResultCache:
+    """Thread-safe LRU of search results with a TTL and catalogue-version stamp."""
+
+    def __init__(
+        self, max_size: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL
+    ):
+        """
+        Initialize result cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl: Seconds before an entry expires
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # (backend, query, count) -> (results, catalogue version, stored_at)
+        self._entries: (
+            "OrderedDict[Tuple[str, str, int], Tuple[List[Dict], int, float]]"
+        ) = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, query: str, count: int, backend: str = "") -> Optional[List[Dict]]:
+        """
+        Get cached results for a normalized query.
+
+        Args:
+            query: Normalized query text
+            count: Number of results requested
+            backend: Search path the results came from, if not the default
+
+        Returns:
+            Cached result list, or None on a miss
+        """
+        key = (backend, query, count)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            results, version, stored_at = entry
+            if (
+                version != get_catalogue_version()
+                or time.monotonic() - stored_at > self.ttl
+            ):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+
+    def put(
+        self, query: str, count: int, results: List[Dict], backend: str = ""
+    ) -> None:
+        """
+        Store results for a normalized query.
+
+        Args:
+            query: Normalized query text
+            count: Number of results requested
+            results: Search results
+            backend: Search path the results came from, if not the default
+        """
+        if self.max_size <= 0:
+            return
+        key = (backend, query, count)
+        with self._lock:
+            self._entries[key] = (
+                list(results),
+                get_catalogue_version(),
+                time.monotonic(),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "size": len(self._entries),
+        }
+
+
+# Global cache instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get or create global result cache."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
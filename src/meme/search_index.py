@@ -0,0 +1,289 @@
+"""In-process trigram search index over meme aliases.
+
+Mirrors PostgreSQL pg_trgm ``similarity()`` so that alias search can be
+answered from memory without a database round trip.
+"""
+
+import heapq
+import logging
+import os
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, cast
+
+import numpy as np
+from dotenv import load_dotenv
+
+from meme.dataset import get_dataset
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Search backend: "postgres" (pg_trgm query per message), "memory" (this index),
+# "vector" (pgvector embedding search) or "hybrid" (trigram + vector fused)
+MEME_SEARCH_BACKEND = os.getenv("MEME_SEARCH_BACKEND", "postgres").lower()
+
+# Same threshold as MemeDataset.search_by_alias
+SIMILARITY_THRESHOLD = 0.3
+
+
+# Owner slot of aliases whose meme was removed
+_DEAD = 2**32 - 1
+
+
+def _float4(value: float) -> float:
+    """Round a score to float4, the precision pg_trgm computes similarity in."""
+    return float(np.float32(value))
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    """
+    Extract the pg_trgm trigram set of a string.
+
+    The text is lowercased and split into words of alphanumeric characters.
+    Each word is padded with two spaces in front and one behind before its
+    trigrams are taken, exactly like pg_trgm does.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Set of distinct trigrams
+    """
+    trigrams: Set[str] = set()
+    word: List[str] = []
+    for char in text.lower() + " ":
+        if char.isalnum():
+            word.append(char)
+            continue
+        if word:
+            padded = "  " + "".join(word) + " "
+            for i in range(len(padded) - 2):
+                trigrams.add(padded[i : i + 3])
+            word = []
+    return trigrams
+
+
+class TrigramIndex:
+    """Immutable trigram inverted index over meme aliases."""
+
+    def __init__(self, memes: Iterable[Dict]):
+        """
+        Build index from meme rows.
+
+        Args:
+            memes: Meme dictionaries with id, meme_id, name and aliases
+        """
+        # Removed memes leave None here, and _DEAD in their aliases' owner slot
+        self._memes: List[Optional[Dict]] = []
+        self._positions: Dict[str, int] = {}
+        # Per meme: position of its first alias (a meme's aliases are adjacent)
+        self._alias_start = array("I")
+        # Per alias: owning meme position and number of distinct trigrams
+        self._alias_meme = array("I")
+        self._alias_size = array("I")
+        self._postings: Dict[str, array] = {}
+        self._dead_aliases = 0
+
+        for meme in memes:
+            self._add(meme)
+
+    def _add(self, meme: Dict, copied: Optional[Set[str]] = None) -> None:
+        """
+        Append a meme and its aliases.
+
+        Args:
+            meme: Meme dictionary
+            copied: When patching a copy, trigrams whose posting list was
+                already copied; other lists are shared with the source index
+        """
+        aliases = meme.get("aliases") or []
+        if not aliases:
+            # unnest() of an empty/NULL array yields no rows in SQL either
+            return
+        meme_pos = len(self._memes)
+        self._memes.append(meme)
+        self._positions[meme["meme_id"]] = meme_pos
+        self._alias_start.append(len(self._alias_meme))
+        postings = self._postings
+        for alias in aliases:
+            trigrams = extract_trigrams(alias)
+            alias_pos = len(self._alias_meme)
+            self._alias_meme.append(meme_pos)
+            self._alias_size.append(len(trigrams))
+            for trigram in trigrams:
+                plist = postings.get(trigram)
+                if plist is None:
+                    plist = postings[trigram] = array("I")
+                    if copied is not None:
+                        copied.add(trigram)
+                elif copied is not None and trigram not in copied:
+                    plist = postings[trigram] = array("I", plist)
+                    copied.add(trigram)
+                plist.append(alias_pos)
+
+    def _remove(self, meme_id: str) -> None:
+        """Mark a meme and its aliases dead; posting lists keep the stale entries."""
+        meme_pos = self._positions.pop(meme_id, None)
+        if meme_pos is None:
+            return
+        meme = self._memes[meme_pos]
+        if meme is None:
+            return
+        self._memes[meme_pos] = None
+        start = self._alias_start[meme_pos]
+        for alias_pos in range(start, start + len(meme["aliases"])):
+            self._alias_meme[alias_pos] = _DEAD
+        self._dead_aliases += len(meme["aliases"])
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def alias_count(self) -> int:
+        """Number of indexed aliases."""
+        return len(self._alias_meme) - self._dead_aliases
+
+    def search(self, query: str, limit: int = 1) -> List[Dict]:
+        """
+        Search memes by alias similarity.
+
+        Returns the same rows as MemeDataset.search_by_alias: memes whose best
+        alias similarity is above the threshold, ordered by score.
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return (default: 1)
+
+        Returns:
+            List of meme dictionaries with a score key, empty list if none found
+        """
+        query_trigrams = extract_trigrams(query)
+        query_size = len(query_trigrams)
+        if not query_size or limit <= 0:
+            return []
+
+        # Count shared trigrams per alias via the posting lists
+        shared: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            plist = self._postings.get(trigram)
+            if plist is None:
+                continue
+            for alias_pos in plist:
+                shared[alias_pos] = shared.get(alias_pos, 0) + 1
+
+        # Best alias score per meme (MAX(similarity(a, :query)))
+        best: Dict[int, float] = {}
+        alias_meme = self._alias_meme
+        alias_size = self._alias_size
+        for alias_pos, common in shared.items():
+            meme_pos = alias_meme[alias_pos]
+            if meme_pos == _DEAD:
+                continue
+            score = _float4(common / (alias_size[alias_pos] + query_size - common))
+            # pg_trgm's "> 0.3" compares the float4 score as float8, so a
+            # score of exactly 3/10 (0.30000001 as float4) passes
+            if score <= SIMILARITY_THRESHOLD:
+                continue
+            if score > best.get(meme_pos, 0.0):
+                best[meme_pos] = score
+
+        top = heapq.nlargest(limit, best.items(), key=lambda item: (item[1], -item[0]))
+        # Only live memes reach best, so no entry here is None
+        return [{**cast(Dict, self._memes[pos]), "score": score} for pos, score in top]
+
+    def with_changes(
+        self, upserted: Iterable[Dict], deleted_ids: Iterable[str]
+    ) -> "TrigramIndex":
+        """
+        Build a new index with some memes replaced or removed.
+
+        Only the changed memes' trigrams are extracted: the arrays are copied,
+        removed aliases are marked dead, new ones are appended and only the
+        posting lists they touch are copied. Once dead aliases outnumber live
+        ones the index is rebuilt from the live memes to compact it.
+
+        Args:
+            upserted: New or updated meme rows
+            deleted_ids: meme_ids of removed memes
+
+        Returns:
+            New index; this one is left unchanged for concurrent readers
+        """
+        upserted = list(upserted)
+        index = TrigramIndex.__new__(TrigramIndex)
+        index._memes = list(self._memes)
+        index._positions = dict(self._positions)
+        index._alias_start = array("I", self._alias_start)
+        index._alias_meme = array("I", self._alias_meme)
+        index._alias_size = array("I", self._alias_size)
+        index._postings = dict(self._postings)
+        index._dead_aliases = self._dead_aliases
+
+        for meme_id in set(deleted_ids) | {meme["meme_id"] for meme in upserted}:
+            index._remove(meme_id)
+        copied: Set[str] = set()
+        for meme in upserted:
+            index._add(meme, copied)
+
+        if index._dead_aliases > index.alias_count:
+            return TrigramIndex(meme for meme in index._memes if meme is not None)
+        return index
+
+
+# Global index instance
+_index: Optional[TrigramIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> TrigramIndex:
+    """Get or build global search index from the meme dataset."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = TrigramIndex(get_dataset().get_alias_rows())
+                logger.info(
+                    f"Built trigram search index: {len(index)} memes, "
+                    f"{index.alias_count} aliases"
+                )
+                if not len(index):
+                    # Don't pin an empty index (e.g. DB unavailable), retry next time
+                    return index
+                _index = index
+    return _index
+
+
+def apply_search_index_changes(
+    upserted: Iterable[Dict], deleted_ids: Iterable[str]
+) -> None:
+    """
+    Swap in a search index with changed memes applied, if one was built.
+
+    Args:
+        upserted: New or updated meme rows
+        deleted_ids: meme_ids of removed memes
+    """
+    global _index
+    upserted = list(upserted)
+    deleted_ids = list(deleted_ids)
+    index = _index
+    if index is None:
+        # A build in progress may have read the memes before these changes;
+        # wait for it and patch its result
+        with _index_lock:
+            index = _index
+    while index is not None:
+        # Build outside the lock; searches keep using the old index meanwhile
+        updated = index.with_changes(upserted, deleted_ids)
+        with _index_lock:
+            if _index is index:
+                _index = updated
+                return
+            index = _index
+
+
+def use_memory_search() -> bool:
+    """Whether alias search should be answered from the in-memory index."""
+    return MEME_SEARCH_BACKEND == "memory"
@@ -1,13 +1,25 @@
 """Meme selection logic using alias search."""
 
-import random
 import logging
+import os
 from typing import Dict, List, Optional
 
 from meme.dataset import get_dataset
+from meme.random_pool import get_random_pool
+from meme.result_cache import get_result_cache, normalize_query
+from meme.search_index import (
+    MEME_SEARCH_BACKEND,
+    get_search_index,
+    use_memory_search,
+)
 
 logger = logging.getLogger(__name__)
 
+# Minimum cosine similarity for vector and hybrid search results
+VECTOR_MIN_SCORE = float(os.getenv("VECTOR_MIN_SCORE", 0.3))
+# Reciprocal-rank fusion constant for MEME_SEARCH_BACKEND=hybrid
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
+
 # Response templates
 RESPONSE_TEMPLATES = {
     "default": ["這張給你！", "希望這張適合你", "找到了！"],
@@ -25,10 +37,14 @@ def select_meme(user_text: str, count: int = 3) -> Optional[List[Dict]]:
     Returns:
         List of dictionaries with meme info, or None if no memes found
     """
-    dataset = get_dataset()
-
-    # Search by alias, get up to count results
-    memes = dataset.search_by_alias(user_text, limit=count)
+    query = normalize_query(user_text)
+    cache = get_result_cache()
+    memes = cache.get(query, count)
+    if memes is None:
+        memes = _search(query, count)
+        # Empty results aren't cached: the dataset also returns [] on DB errors
+        if memes:
+            cache.put(query, count, memes)
 
     if not memes:
         logger.warning("No memes found matching query")
@@ -37,6 +53,55 @@ def select_meme(user_text: str, count: int = 3) -> Optional[List[Dict]]:
     return memes
 
 
+def select_meme_by_alias(user_text: str, count: int = 3) -> List[Dict]:
+    """
+    Select memes by alias search only, for latency-bound callers.
+
+    Unlike select_meme, the vector and hybrid backends are bypassed, so the
+    embedding API is never called.
+
+    Args:
+        user_text: User input text
+        count: Maximum number of memes to return (default: 3)
+
+    Returns:
+        List of dictionaries with meme info (empty if none matched)
+    """
+    if MEME_SEARCH_BACKEND not in ("vector", "hybrid"):
+        # The configured backend already is an alias search; share its cache
+        return select_meme(user_text, count) or []
+    query = normalize_query(user_text)
+    cache = get_result_cache()
+    memes = cache.get(query, count, backend="alias")
+    if memes is None:
+        memes = get_dataset().search_by_alias(query, limit=count)
+        # Empty results aren't cached: the dataset also returns [] on DB errors
+        if memes:
+            cache.put(query, count, memes, backend="alias")
+    return memes
+
+
+def _search(user_text: str, count: int) -> List[Dict]:
+    """Run the configured search backend."""
+    # Search by alias, get up to count results
+    if use_memory_search():
+        memes = get_search_index().search(user_text, limit=count)
+    elif MEME_SEARCH_BACKEND == "vector":
+        memes = get_dataset().search_by_embedding(
+            user_text, limit=count, min_score=VECTOR_MIN_SCORE
+        )
+    elif MEME_SEARCH_BACKEND == "hybrid":
+        memes = get_dataset().search_hybrid(
+            user_text,
+            limit=count,
+            min_vector_score=VECTOR_MIN_SCORE,
+            rrf_k=HYBRID_RRF_K,
+        )
+    else:
+        memes = get_dataset().search_by_alias(user_text, limit=count)
+    return memes
+
+
 def select_meme_by_random(intent: str, count: int = 3) -> Optional[List[Dict]]:
     """
     Select random memes.
@@ -48,13 +113,10 @@ def select_meme_by_random(intent: str, count: int = 3) -> Optional[List[Dict]]:
     Returns:
         List of meme dictionaries, or None if no memes available
     """
-    dataset = get_dataset()
-    all_memes = dataset.get_all_memes()
+    # Sample from the cached pool instead of loading the whole table
+    selected_memes = get_random_pool().sample(count)
 
-    if not all_memes:
+    if not selected_memes:
         return None
 
-    # Random selection of count memes
-    selected_memes = random.sample(all_memes, min(count, len(all_memes)))
-
     return selected_memes
@@ -0,0 +1,6 @@
+"""Shared pytest setup."""
+
+import os
+
+# Modules create their engine at import time; tests never connect to it
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://test@localhost/test")
@@ -0,0 +1,68 @@
+"""Tests for the in-memory trigram search index."""
+
+from meme.search_index import TrigramIndex, extract_trigrams
+
+
+def _index(*aliases):
+    return TrigramIndex(
+        [
+            {"id": i, "meme_id": f"SS{i:04d}", "name": alias, "aliases": [alias]}
+            for i, alias in enumerate(aliases, start=1)
+        ]
+    )
+
+
+def test_similarity_of_exactly_threshold_matches():
+    # 3 shared trigrams out of 10, like pg_trgm's similarity() = 0.3 passing "> 0.3"
+    assert len(extract_trigrams("abcdefgh")) == 9
+    assert len(extract_trigrams("abc")) == 4
+
+    results = _index("abcdefgh").search("abc")
+
+    assert [meme["meme_id"] for meme in results] == ["SS0001"]
+    assert results[0]["score"] > 0.3
+
+
+def test_similarity_below_threshold_does_not_match():
+    # 3 shared trigrams out of 11
+    assert _index("abcdefghi").search("abc") == []
+
+
+def _meme(i, *aliases):
+    return {"id": i, "meme_id": f"SS{i:04d}", "name": f"n{i}", "aliases": list(aliases)}
+
+
+def _results(index, query):
+    return sorted((m["meme_id"], m["score"]) for m in index.search(query, limit=50))
+
+
+def test_with_changes_matches_full_rebuild():
+    memes = [
+        _meme(1, "蟹堡王", "krusty krab"),
+        _meme(2, "派大星", "patrick star"),
+        _meme(3, "章魚哥", "squidward"),
+        _meme(4, "海綿寶寶", "spongebob"),
+    ]
+    index = TrigramIndex(memes)
+    upserted = [_meme(2, "patrick"), _meme(5, "蟹老闆", "mr krabs")]
+
+    patched = index.with_changes(upserted, ["SS0003"])
+    rebuilt = TrigramIndex([memes[0], memes[3], *upserted])
+
+    assert len(patched) == len(rebuilt) == 4
+    assert patched.alias_count == rebuilt.alias_count
+    for query in ["krab", "patrick star", "squidward", "蟹", "spongebob"]:
+        assert _results(patched, query) == _results(rebuilt, query)
+    # The source index is left unchanged
+    assert [m[0] for m in _results(index, "squidward")] == ["SS0003"]
+    assert [m[0] for m in _results(index, "patrick star")] == ["SS0002"]
+
+
+def test_with_changes_compacts_when_mostly_dead():
+    index = TrigramIndex([_meme(i, f"alias{i}") for i in range(1, 5)])
+
+    patched = index.with_changes([], ["SS0001", "SS0002", "SS0003"])
+
+    assert len(patched) == 1
+    assert patched._dead_aliases == 0
+    assert [m[0] for m in _results(patched, "alias4")] == ["SS0004"]
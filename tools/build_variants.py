@@ -0,0 +1,216 @@
+"""Build size-capped image variants of meme images in R2."""
+
+import io
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+import boto3
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+from sqlalchemy import select
+
+from bot.image_variants import VARIANTS, ImageVariant, variant_key
+from db.connection import SessionLocal
+from db.models import Meme
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# R2 configuration
+R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
+R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
+R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "spongebob-memes")
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")
+R2_REGION = os.getenv("R2_REGION", "auto")
+
+# Memes processed in parallel
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 8))
+
+_MIN_QUALITY = 40
+
+
+def render_variant(data: bytes, variant: ImageVariant) -> bytes:
+    """
+    Re-encode an image as a size-capped JPEG.
+
+    The image is rotated per EXIF, flattened onto white and scaled down to
+    the variant's longest side. JPEG quality is then lowered, and if that is
+    not enough the image is scaled down further, until it fits max_bytes.
+
+    Args:
+        data: Source image bytes (any format Pillow reads)
+        variant: Variant settings
+
+    Returns:
+        JPEG bytes
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+    max_side = variant.max_side
+    while True:
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        quality = variant.quality
+        while True:
+            buffer = io.BytesIO()
+            resized.save(
+                buffer, "JPEG", quality=quality, optimize=True, progressive=True
+            )
+            if buffer.tell() <= variant.max_bytes or quality <= _MIN_QUALITY:
+                break
+            quality -= 10
+        if buffer.tell() <= variant.max_bytes or max_side <= 64:
+            return buffer.getvalue()
+        max_side = int(max_side * 0.8)
+
+
+def get_r2_client():
+    """Create an R2 S3 client."""
+    if not all([R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_ENDPOINT_URL]):
+        raise ValueError(
+            "R2 configuration missing. Please set R2_ACCESS_KEY_ID, "
+            "R2_SECRET_ACCESS_KEY, and R2_ENDPOINT_URL environment variables."
+        )
+    return boto3.client(
+        "s3",
+        endpoint_url=R2_ENDPOINT_URL,
+        aws_access_key_id=R2_ACCESS_KEY_ID,
+        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+        region_name=R2_REGION,
+    )
+
+
+def _exists(client, key: str) -> bool:
+    try:
+        client.head_object(Bucket=R2_BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def build_meme_variants(client, meme_id: str, force: bool = False) -> Dict[str, int]:
+    """
+    Build and upload the missing variants of one meme.
+
+    Args:
+        client: boto3 S3 client
+        meme_id: Meme ID
+        force: Rebuild variants that already exist
+
+    Returns:
+        Dictionary mapping each uploaded variant to its size in bytes
+    """
+    missing = [
+        variant
+        for variant in VARIANTS.values()
+        if force or not _exists(client, variant_key(meme_id, variant.name))
+    ]
+    if not missing:
+        return {}
+
+    response = client.get_object(Bucket=R2_BUCKET_NAME, Key=variant_key(meme_id))
+    original = response["Body"].read()
+
+    uploaded = {}
+    for variant in missing:
+        data = render_variant(original, variant)
+        client.put_object(
+            Bucket=R2_BUCKET_NAME,
+            Key=variant_key(meme_id, variant.name),
+            Body=data,
+            ContentType="image/jpeg",
+            # Keys are versioned, so the content under a key never changes
+            CacheControl="public, max-age=31536000, immutable",
+        )
+        uploaded[variant.name] = len(data)
+    logger.debug(f"Built variants for {meme_id}: {uploaded}")
+    return uploaded
+
+
+def build_variants(meme_ids: List[str], force: bool = False) -> Dict[str, int]:
+    """
+    Build variants for many memes in parallel.
+
+    Args:
+        meme_ids: Meme IDs
+        force: Rebuild variants that already exist
+
+    Returns:
+        Dictionary with build statistics
+    """
+    client = get_r2_client()
+    stats = {"built": 0, "up_to_date": 0, "errors": 0, "bytes": 0}
+    with ThreadPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS) as executor:
+        futures = {
+            executor.submit(build_meme_variants, client, meme_id, force): meme_id
+            for meme_id in meme_ids
+        }
+        for future in as_completed(futures):
+            meme_id = futures[future]
+            try:
+                uploaded = future.result()
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"Error building variants for {meme_id}: {e}")
+                continue
+            if uploaded:
+                stats["built"] += 1
+                stats["bytes"] += sum(uploaded.values())
+            else:
+                stats["up_to_date"] += 1
+    return stats
+
+
+def main():
+    """Main function for building image variants."""
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print("Usage: python tools/build_variants.py [meme_id ...] [--force]")
+        print("\nBuilds re-encoded variants of every meme (or the given ones):")
+        for variant in VARIANTS.values():
+            print(
+                f"  {variant_key('<meme_id>', variant.name)}: "
+                f"max {variant.max_side}px, max {variant.max_bytes // 1024} KB"
+            )
+        print("\nOptions:")
+        print("  --force: Rebuild variants that already exist")
+        print("\nEnvironment variables:")
+        print("  IMAGE_VARIANT_WORKERS: Memes processed in parallel (default: 8)")
+        print("  IMAGE_VARIANTS=true: Make the bot serve the variants")
+        sys.exit(0)
+
+    force = "--force" in sys.argv
+    meme_ids = [arg.upper() for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not meme_ids:
+        db = SessionLocal()
+        try:
+            meme_ids = list(db.execute(select(Meme.meme_id)).scalars())
+        finally:
+            db.close()
+
+    print(f"Building image variants for {len(meme_ids)} memes...")
+    stats = build_variants(meme_ids, force=force)
+    print("\nBuild completed!")
+    print(f"  Built: {stats['built']}")
+    print(f"  Up to date: {stats['up_to_date']}")
+    print(f"  Errors: {stats['errors']}")
+    print(f"  Uploaded: {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
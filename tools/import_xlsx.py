@@ -1,19 +1,29 @@
 """Import memes from Excel file to database."""
 
+import hashlib
+import json
 import os
+import random
+import re
 import sys
 import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from openpyxl import load_workbook
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import ARRAY, String, any_, delete, literal, select, text
 
+from db.catalogue import meme_content_hash, record_catalogue_changes
 from db.connection import SessionLocal, init_db
 from db.models import Meme
+from meme.embeddings import get_embedding_provider, meme_text
 
 load_dotenv()
 
@@ -24,6 +34,19 @@ logger = logging.getLogger(__name__)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+# Alias generation: "openai", or "stub" to derive aliases locally without network
+ALIAS_CLIENT = os.getenv("ALIAS_CLIENT", "openai").lower()
+ALIAS_BATCH_SIZE = int(os.getenv("ALIAS_BATCH_SIZE", 50))
+ALIAS_CONCURRENCY = int(os.getenv("ALIAS_CONCURRENCY", 4))
+ALIAS_MAX_RETRIES = int(os.getenv("ALIAS_MAX_RETRIES", 3))
+ALIAS_RETRY_DELAY = float(os.getenv("ALIAS_RETRY_DELAY", 1))
+# Generated aliases keyed by (model, prompt version, name); empty disables
+ALIAS_CACHE_DIR = os.getenv("ALIAS_CACHE_DIR", ".cache/aliases")
+# Bump when the alias prompts change so cached aliases are regenerated
+ALIAS_PROMPT_VERSION = "1"
+# Memes per existence query and upsert statement
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+
 
 def parse_meme_id(value) -> str:
     """
@@ -74,37 +97,18 @@ def parse_aliases(value) -> list[str]:
     return [alias.strip() for alias in aliases_str.split(",") if alias.strip()]
 
 
-def generate_aliases_with_openai(
-    names: List[str], batch_size: int = 50
-) -> Dict[str, List[str]]:
-    """
-    Generate aliases for meme names using OpenAI API (batch processing).
-
-    Args:
-        names: List of meme names
-        batch_size: Number of names to process in each batch
-
-    Returns:
-        Dictionary mapping name to list of aliases
-    """
-    if not OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not set, skipping alias generation")
-        return {}
+ALIAS_SYSTEM_PROMPT = """
+你是搜尋關鍵字設計專家，負責為梗圖系統產生 aliases。
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    results = {}
+aliases 將用於 PostgreSQL pg_trgm 模糊搜尋（短字串比對）。
+請遵守：
+- alias 長度 2–4 字（最多 5）
+- 取句子部分片段、關鍵字
 
-    # Process in batches
-    for i in range(0, len(names), batch_size):
-        batch = names[i : i + batch_size]
-        logger.info(
-            f"Generating aliases for batch {i//batch_size + 1} ({len(batch)} memes)..."
-        )
+輸出必須是合法 JSON，將被程式直接解析。
+"""
 
-        try:
-            # Create prompt for batch
-            names_list = "\n".join([f"- {name}" for name in batch])
-            prompt = f"""
+ALIAS_USER_PROMPT = """
 請為以下「海綿寶寶梗圖名稱」生成搜尋用 aliases。
 
 需求說明：
@@ -123,192 +127,596 @@ def generate_aliases_with_openai(
 }}
 """
 
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """
-你是搜尋關鍵字設計專家，負責為梗圖系統產生 aliases。
 
-aliases 將用於 PostgreSQL pg_trgm 模糊搜尋（短字串比對）。
-請遵守：
-- alias 長度 2–4 字（最多 5）
-- 取句子部分片段、關鍵字
+class OpenAIAliasClient:
+    """Generates aliases for a batch of names with one chat completion."""
+
+    def __init__(self, model: str = OPENAI_MODEL):
+        """
+        Initialize OpenAI alias client.
+
+        Args:
+            model: OpenAI chat model
+        """
+        self.model = model
+        self._client = OpenAI(api_key=OPENAI_API_KEY)
+
+    def generate(self, names: List[str]) -> Dict[str, List[str]]:
+        """
+        Generate aliases for names.
+
+        Args:
+            names: Meme names
+
+        Returns:
+            Dictionary mapping name to aliases (names may be missing)
+        """
+        names_list = "\n".join([f"- {name}" for name in names])
+        response = self._client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": ALIAS_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": ALIAS_USER_PROMPT.format(names_list=names_list),
+                },
+            ],
+            response_format={"type": "json_object"},
+        )
+        content = response.choices[0].message.content
+        if not content:
+            raise ValueError("Empty response from OpenAI")
+        return json.loads(content)
+
+
+class StubAliasClient:
+    """Offline alias client deriving aliases from the name itself."""
+
+    model = "stub"
+
+    def generate(self, names: List[str]) -> Dict[str, List[str]]:
+        """
+        Generate aliases for names without any network access.
+
+        Args:
+            names: Meme names
+
+        Returns:
+            Dictionary mapping name to aliases
+        """
+        results = {}
+        for name in names:
+            words = re.findall(r"\w+", name)
+            aliases = [word[:5] for word in words if len(word) >= 2]
+            compact = "".join(words)
+            aliases += [compact[:4], compact[-4:]]
+            results[name] = list(dict.fromkeys(a for a in aliases if len(a) >= 2))[:4]
+        return results
+
+
+class AliasCache:
+    """On-disk content-addressed cache of generated aliases."""
+
+    def __init__(self, directory: Path, model: str, prompt_version: str):
+        """
+        Initialize alias cache.
+
+        Args:
+            directory: Cache directory
+            model: Model the aliases were generated with
+            prompt_version: Version of the alias prompts
+        """
+        self.directory = directory
+        self.model = model
+        self.prompt_version = prompt_version
+
+    def _path(self, name: str) -> Path:
+        key = json.dumps([self.model, self.prompt_version, name], ensure_ascii=False)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, name: str) -> Optional[List[str]]:
+        """Get cached aliases for a name, or None on a miss."""
+        try:
+            return json.loads(self._path(name).read_text(encoding="utf-8"))["aliases"]
+        except (OSError, ValueError, KeyError):
+            return None
 
-輸出必須是合法 JSON，將被程式直接解析。
-""",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                response_format={"type": "json_object"},
+    def put(self, name: str, aliases: List[str]) -> None:
+        """Store aliases for a name."""
+        path = self._path(name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"name": name, "aliases": aliases}, f, ensure_ascii=False)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Failed to write alias cache file: {e}")
+
+
+def get_alias_client():
+    """Get the configured alias client, or None if it isn't available."""
+    if ALIAS_CLIENT == "stub":
+        return StubAliasClient()
+    if not OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not set, skipping alias generation")
+        return None
+    return OpenAIAliasClient()
+
+
+def _generate_batch(client, names: List[str], max_retries: int) -> Dict[str, List[str]]:
+    """Generate aliases for one batch, retrying failures and missing names."""
+    results: Dict[str, List[str]] = {}
+    pending = names
+    for attempt in range(max_retries + 1):
+        if attempt:
+            delay = ALIAS_RETRY_DELAY * 2 ** (attempt - 1)
+            time.sleep(delay + random.uniform(0, delay))
+        try:
+            generated = client.generate(pending)
+        except Exception as e:
+            logger.warning(
+                f"Alias generation failed for {len(pending)} names "
+                f"(attempt {attempt + 1}/{max_retries + 1}): {e}"
             )
+            continue
+        for name in pending:
+            aliases = generated.get(name)
+            if isinstance(aliases, list):
+                results[name] = [str(alias) for alias in aliases]
+        pending = [name for name in pending if name not in results]
+        if not pending:
+            break
+    if pending:
+        logger.error(f"No aliases generated for {len(pending)} names: {pending[:5]}")
+    return results
 
-            import json
 
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("Empty response from OpenAI")
-            aliases_dict = json.loads(content)
+def generate_aliases(
+    names: List[str],
+    client=None,
+    batch_size: int = ALIAS_BATCH_SIZE,
+    concurrency: int = ALIAS_CONCURRENCY,
+    max_retries: int = ALIAS_MAX_RETRIES,
+    cache_dir: Optional[str] = ALIAS_CACHE_DIR,
+) -> Dict[str, List[str]]:
+    """
+    Generate aliases for meme names, reusing cached results.
 
-            # Update results
-            for name in batch:
-                if name in aliases_dict:
-                    results[name] = aliases_dict[name]
-                else:
-                    logger.warning(f"No aliases generated for: {name}")
-                    results[name] = []
+    Names are looked up in the alias cache first; the rest are sent in batches
+    to the client from a thread pool, with retries and exponential backoff.
+    Names that still fail are left out so they are retried on the next run.
 
-        except Exception as e:
-            logger.error(f"Error generating aliases for batch: {e}")
-            # Fallback: set empty aliases for this batch
-            for name in batch:
-                results[name] = []
+    Args:
+        names: List of meme names
+        client: Alias client (default: get_alias_client())
+        batch_size: Number of names per request
+        concurrency: Number of requests in flight at once
+        max_retries: Retries per batch after the first attempt
+        cache_dir: Alias cache directory, or None/empty to disable the cache
 
+    Returns:
+        Dictionary mapping name to list of aliases
+    """
+    if client is None:
+        client = get_alias_client()
+    model = client.model if client is not None else OPENAI_MODEL
+    cache = (
+        AliasCache(Path(cache_dir), model, ALIAS_PROMPT_VERSION) if cache_dir else None
+    )
+
+    results: Dict[str, List[str]] = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        aliases = cache.get(name) if cache else None
+        if aliases is None:
+            missing.append(name)
+        else:
+            results[name] = aliases
+    if results:
+        logger.info(f"Reused cached aliases for {len(results)} names")
+    if not missing or client is None:
+        return results
+
+    batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+    logger.info(
+        f"Generating aliases for {len(missing)} names in {len(batches)} batches "
+        f"({concurrency} at a time)..."
+    )
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [
+            executor.submit(_generate_batch, client, batch, max_retries)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            for name, aliases in future.result().items():
+                results[name] = aliases
+                if cache:
+                    cache.put(name, aliases)
     return results
 
 
-def read_xlsx(file_path: Path) -> List[Dict]:
+def fill_missing_embeddings(db: Session, batch_size: int = 256) -> int:
     """
-    Read memes from Excel file.
+    Compute embeddings for memes that don't have one yet.
+
+    Args:
+        db: Database session
+        batch_size: Number of memes embedded per provider call
+
+    Returns:
+        Number of memes embedded
+    """
+    provider = get_embedding_provider()
+    memes = db.execute(select(Meme).where(Meme.embedding.is_(None))).scalars().all()
+    for i in range(0, len(memes), batch_size):
+        batch = memes[i : i + batch_size]
+        vectors = provider.embed([meme_text(m.name, m.aliases) for m in batch])
+        for meme, vector in zip(batch, vectors):
+            meme.embedding = vector
+    if memes:
+        logger.info(f"Computed embeddings for {len(memes)} memes")
+    return len(memes)
+
+
+def iter_xlsx(file_path: Path) -> Iterator[Dict]:
+    """
+    Stream memes from Excel file row by row.
 
     Expected format:
     - Column A: ID (e.g., SS0001, SS0002)
     - Column B: Name
     - Column C: Aliases (comma-separated, optional, will be generated if empty)
 
+    Args:
+        file_path: Path to Excel file
+
+    Yields:
+        Meme dictionaries
+    """
+    # read_only parses the sheet lazily instead of loading it all into memory
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        # Skip header row (row 1), start from row 2
+        for row_idx, row in enumerate(
+            sheet.iter_rows(min_row=2, values_only=True), start=2
+        ):
+            if not any(row):  # Skip empty rows
+                continue
+
+            meme_id = parse_meme_id(row[0])
+            name = parse_name(row[1]) if len(row) > 1 else ""
+            aliases = parse_aliases(row[2]) if len(row) > 2 else []
+
+            if not meme_id or not name:
+                logger.warning(f"Row {row_idx}: Missing required fields, skipping")
+                continue
+
+            yield {"id": meme_id, "name": name, "aliases": aliases}
+    finally:
+        workbook.close()
+
+
+def iter_unique_xlsx(file_path: Path) -> Iterator[Dict]:
+    """
+    Stream memes from Excel file, keeping only the last row of each ID.
+
+    The file is read twice: the first pass only records where each ID last
+    appears, so memory stays proportional to the number of IDs, not rows.
+    Import and sync both read through this, so a sheet with duplicate IDs
+    leaves the same data either way.
+
+    Args:
+        file_path: Path to Excel file
+
+    Yields:
+        Meme dictionaries with unique IDs, in the order of their last row
+    """
+    last_position = {meme["id"]: i for i, meme in enumerate(iter_xlsx(file_path))}
+    for i, meme in enumerate(iter_xlsx(file_path)):
+        if last_position.get(meme["id"]) != i:
+            logger.warning(f"Duplicate ID {meme['id']}: a later row replaces it")
+            continue
+        yield meme
+
+
+def read_xlsx(file_path: Path) -> List[Dict]:
+    """
+    Read all memes from Excel file.
+
     Args:
         file_path: Path to Excel file
 
     Returns:
         List of meme dictionaries
     """
-    workbook = load_workbook(file_path, data_only=True)
-    sheet = workbook.active
-
-    memes = []
-    # Skip header row (row 1), start from row 2
-    for row_idx, row in enumerate(
-        sheet.iter_rows(min_row=2, values_only=True), start=2
-    ):
-        if not any(row):  # Skip empty rows
-            continue
+    return list(iter_xlsx(file_path))
 
-        meme_id = parse_meme_id(row[0])
-        name = parse_name(row[1])
-        aliases = parse_aliases(row[2]) if len(row) > 2 else []
 
-        if not meme_id or not name:
-            logger.warning(f"Row {row_idx}: Missing required fields, skipping")
-            continue
+def chunked(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """
+    Group an iterable into lists of at most size items.
+
+    Args:
+        items: Items to group
+        size: Maximum chunk size
+
+    Yields:
+        Lists of items
+    """
+    chunk: List[Dict] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _existing_meme_ids(db: Session, meme_ids: List[str]) -> Set[str]:
+    """Get which of the given meme IDs are already stored, in one query."""
+    rows = db.execute(
+        select(Meme.meme_id).where(
+            Meme.meme_id == any_(literal(meme_ids, ARRAY(String)))
+        )
+    ).scalars()
+    return set(rows)
+
+
+def _upsert_chunk(db: Session, memes: List[Dict], update_existing: bool) -> int:
+    """
+    Write a chunk of memes with a single INSERT ... ON CONFLICT statement.
+
+    Args:
+        db: Database session
+        memes: Meme dictionaries with unique IDs
+        update_existing: If True, overwrite existing memes; if False, keep them
+
+    Returns:
+        Number of memes embedded
+    """
+    vectors = get_embedding_provider().embed(
+        [meme_text(m["name"], m.get("aliases")) for m in memes]
+    )
+    stmt = insert(Meme).values(
+        [
+            {
+                "meme_id": m["id"],
+                "name": m["name"],
+                "aliases": m.get("aliases", []),
+                "embedding": vector,
+                "content_hash": m.get("content_hash"),
+            }
+            for m, vector in zip(memes, vectors)
+        ]
+    )
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Meme.meme_id],
+            set_={
+                "name": stmt.excluded.name,
+                "aliases": stmt.excluded.aliases,
+                "embedding": stmt.excluded.embedding,
+                "content_hash": stmt.excluded.content_hash,
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Meme.meme_id])
+    db.execute(stmt)
+    return len(memes)
 
-        memes.append({"id": meme_id, "name": name, "aliases": aliases})
 
-    return memes
+def _hash_memes(memes: Iterable[Dict]) -> None:
+    """Stamp memes with the hash of their name and aliases as read from the sheet."""
+    for meme in memes:
+        meme["content_hash"] = meme_content_hash(meme["name"], meme.get("aliases"))
+
+
+def _fill_aliases(memes: List[Dict], stats: Dict) -> None:
+    """
+    Generate aliases for the memes that have none.
+
+    Memes left without aliases get no content hash, so the next sync sees
+    them as changed and asks for their aliases again.
+    """
+    needing_aliases = [m for m in memes if not m.get("aliases")]
+    if not needing_aliases:
+        return
+    generated_aliases = generate_aliases([m["name"] for m in needing_aliases])
+    for meme in needing_aliases:
+        if generated_aliases.get(meme["name"]):
+            meme["aliases"] = generated_aliases[meme["name"]]
+            stats["aliases_generated"] += 1
+        else:
+            meme["content_hash"] = None
+
+
+def _write_chunk(
+    db: Session, memes: List[Dict], update_existing: bool, stats: Dict
+) -> bool:
+    """Upsert a chunk in a savepoint, so a bad chunk is counted and skipped."""
+    try:
+        with db.begin_nested():
+            stats["embeddings"] += _upsert_chunk(db, memes, update_existing)
+        return True
+    except Exception as e:
+        stats["errors"] += len(memes)
+        logger.error(f"Error importing chunk of {len(memes)} memes: {e}")
+        return False
+
+
+def _commit_import(
+    db: Session, stats: Dict, upserted: List[str], deleted: List[str]
+) -> None:
+    """Record the catalogue changes and commit the import."""
+    try:
+        # Memes stored before embeddings existed
+        stats["embeddings"] += fill_missing_embeddings(db)
+        stats["version"] = record_catalogue_changes(db, upserted, deleted)
+        db.commit()
+        logger.info("All changes committed to database")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error committing to database: {e}")
+        raise
 
 
 def import_memes_to_db(
-    memes: List[Dict], db: Session, update_existing: bool = False
+    memes: Iterable[Dict],
+    db: Session,
+    update_existing: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
 ) -> Dict:
     """
-    Import memes to database.
+    Import memes to database in chunks.
+
+    Each chunk costs one existence query, alias generation for the new memes
+    that have none, and one upsert, all in the same transaction.
 
     Args:
-        memes: List of meme dictionaries
+        memes: Meme dictionaries (any iterable, e.g. iter_unique_xlsx)
         db: Database session
         update_existing: If True, update existing memes; if False, skip them
+        chunk_size: Number of memes written per statement
 
     Returns:
         Dictionary with import statistics
     """
     stats = {
+        "total": 0,
         "inserted": 0,
         "updated": 0,
         "skipped": 0,
         "errors": 0,
         "aliases_generated": 0,
+        "embeddings": 0,
+        "version": None,
     }
+    written: List[str] = []
 
-    # First, check which memes will be skipped (if update_existing=False)
-    # We need to know this before generating aliases to avoid wasting API calls
-    existing_meme_ids = set()
-    if not update_existing:
-        for meme_data in memes:
-            meme_id = meme_data.get("id")
-            if meme_id:
-                existing = db.execute(
-                    select(Meme).where(Meme.meme_id == meme_id)
-                ).scalar_one_or_none()
-                if existing:
-                    existing_meme_ids.add(meme_id)
-
-    # Find memes that need aliases and won't be skipped
-    memes_needing_aliases = [
-        m
-        for m in memes
-        if not m.get("aliases") and m.get("id") not in existing_meme_ids
-    ]
-    if memes_needing_aliases:
-        logger.info(
-            f"Generating aliases for {len(memes_needing_aliases)} memes using OpenAI..."
-        )
-        names_to_generate = [m["name"] for m in memes_needing_aliases]
-        generated_aliases = generate_aliases_with_openai(names_to_generate)
+    try:
+        for chunk in chunked(memes, chunk_size):
+            stats["total"] += len(chunk)
+            # One statement can't touch a row twice, so the last row of an ID wins
+            by_id = {meme["id"]: meme for meme in chunk}
+            stats["skipped"] += len(chunk) - len(by_id)
+            existing = _existing_meme_ids(db, list(by_id))
+
+            if update_existing:
+                to_write = list(by_id.values())
+            else:
+                # Skip existing memes before generating aliases to save API calls
+                to_write = [m for m in by_id.values() if m["id"] not in existing]
+                stats["skipped"] += len(by_id) - len(to_write)
+
+            _hash_memes(to_write)
+            _fill_aliases(to_write, stats)
+            if not to_write or not _write_chunk(db, to_write, update_existing, stats):
+                continue
+
+            written.extend(m["id"] for m in to_write)
+            updated = sum(1 for m in to_write if m["id"] in existing)
+            stats["updated"] += updated
+            stats["inserted"] += len(to_write) - updated
+            logger.info(
+                f"Imported {stats['total']} rows so far "
+                f"({stats['inserted']} inserted, {stats['updated']} updated)"
+            )
+    except Exception:
+        db.rollback()
+        raise
 
-        # Update memes with generated aliases
-        for meme in memes_needing_aliases:
-            if meme["name"] in generated_aliases:
-                meme["aliases"] = generated_aliases[meme["name"]]
-                stats["aliases_generated"] += 1
+    _commit_import(db, stats, written, [])
+    return stats
 
-    # Import to database
-    for meme_data in memes:
-        try:
-            meme_id = meme_data["id"]
-            name = meme_data["name"]
-            aliases = meme_data.get("aliases", [])
-
-            # Check if meme exists
-            existing = db.execute(
-                select(Meme).where(Meme.meme_id == meme_id)
-            ).scalar_one_or_none()
-
-            if existing:
-                if update_existing:
-                    existing.name = name
-                    existing.aliases = aliases
-                    stats["updated"] += 1
-                    logger.info(f"Updated meme: {meme_id}")
-                else:
-                    stats["skipped"] += 1
-                    logger.debug(f"Skipped existing meme: {meme_id}")
-            else:
-                # Create new meme
-                new_meme = Meme(meme_id=meme_id, name=name, aliases=aliases)
-                db.add(new_meme)
-                stats["inserted"] += 1
-                logger.info(f"Inserted meme: {meme_id} - {name}")
 
-        except Exception as e:
-            stats["errors"] += 1
-            logger.error(f"Error importing meme {meme_data.get('id', 'unknown')}: {e}")
+def sync_memes_to_db(
+    memes: Iterable[Dict], db: Session, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Dict:
+    """
+    Make the memes table match the sheet, writing only what changed.
+
+    Each meme's name and aliases are hashed and compared with the hash stored
+    on the last import: new and changed memes are upserted, unchanged ones are
+    left alone and memes missing from the sheet are deleted. The changes are
+    recorded under a new catalogue version for running bots to pick up.
+
+    Args:
+        memes: Meme dictionaries (any iterable, e.g. iter_unique_xlsx)
+        db: Database session
+        chunk_size: Number of memes written per statement
+
+    Returns:
+        Dictionary with sync statistics
+    """
+    stats = {
+        "total": 0,
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "deleted": 0,
+        "skipped": 0,
+        "errors": 0,
+        "aliases_generated": 0,
+        "embeddings": 0,
+        "version": None,
+    }
+    stored = dict(db.execute(select(Meme.meme_id, Meme.content_hash)).all())
+    seen: Set[str] = set()
+    written: List[str] = []
 
-    # Commit all changes
     try:
-        db.commit()
-        logger.info("All changes committed to database")
-    except Exception as e:
+        for chunk in chunked(memes, chunk_size):
+            stats["total"] += len(chunk)
+            # Same rule as import_memes_to_db: the last row of an ID wins
+            by_id = {meme["id"]: meme for meme in chunk}
+            stats["skipped"] += len(chunk) - len(by_id)
+            changed = []
+            for meme in by_id.values():
+                seen.add(meme["id"])
+                _hash_memes([meme])
+                if stored.get(meme["id"]) == meme["content_hash"]:
+                    stats["unchanged"] += 1
+                else:
+                    changed.append(meme)
+
+            _fill_aliases(changed, stats)
+            if not changed or not _write_chunk(db, changed, True, stats):
+                continue
+
+            written.extend(m["id"] for m in changed)
+            updated = sum(1 for m in changed if m["id"] in stored)
+            stats["updated"] += updated
+            stats["inserted"] += len(changed) - updated
+            # A later chunk repeating an ID is compared with what was just written
+            stored.update((m["id"], m["content_hash"]) for m in changed)
+
+        deleted = [meme_id for meme_id in stored if meme_id not in seen]
+        if deleted and not seen:
+            # An empty or unreadable sheet must not wipe the catalogue
+            logger.warning("No memes read, skipping deletion")
+            deleted = []
+        for i in range(0, len(deleted), chunk_size):
+            batch = deleted[i : i + chunk_size]
+            db.execute(
+                delete(Meme).where(Meme.meme_id == any_(literal(batch, ARRAY(String))))
+            )
+        stats["deleted"] = len(deleted)
+    except Exception:
         db.rollback()
-        logger.error(f"Error committing to database: {e}")
         raise
 
+    _commit_import(db, stats, written, deleted)
     return stats
 
 
 def main():
     """Main function for importing Excel file."""
     if len(sys.argv) < 2:
-        print("Usage: python tools/import_xlsx.py <excel_file> [--update]")
+        print("Usage: python tools/import_xlsx.py <excel_file> [--update | --sync]")
         print("\nExcel format:")
         print("  Column A: ID (e.g., SS0001, SS0002)")
         print("  Column B: Name")
@@ -316,16 +724,23 @@ def main():
         print("            If empty, aliases will be generated using OpenAI API")
         print("\nOptions:")
         print("  --update: Update existing memes instead of skipping them")
+        print("  --sync: Write only changed memes and delete memes not in the file")
         print(
             "\nNote: Images should be uploaded to R2 at spongebob-memes/{meme_id}.jpg"
         )
         print("\nEnvironment variables:")
         print("  OPENAI_API_KEY: OpenAI API key (required for alias generation)")
         print("  OPENAI_MODEL: OpenAI model to use (default: gpt-4o-mini)")
+        print("  ALIAS_CLIENT: openai (default) or stub (offline, no API calls)")
+        print("  ALIAS_CONCURRENCY: Alias requests in flight at once (default: 4)")
+        print("  ALIAS_CACHE_DIR: Generated alias cache (default: .cache/aliases)")
+        print("  EMBEDDING_PROVIDER: hashing (local, default) or openai")
+        print("  IMPORT_CHUNK_SIZE: Memes written per statement (default: 1000)")
         sys.exit(1)
 
     excel_file = Path(sys.argv[1])
     update_existing = "--update" in sys.argv
+    sync = "--sync" in sys.argv
 
     if not excel_file.exists():
         print(f"Error: File not found: {excel_file}")
@@ -335,27 +750,39 @@ def main():
     print("Initializing database...")
     init_db()
 
-    # Read Excel file
-    print(f"Reading Excel file: {excel_file}")
-    memes = read_xlsx(excel_file)
-    print(f"Found {len(memes)} memes in Excel file")
-
-    if not memes:
-        print("No memes found in Excel file")
-        sys.exit(1)
-
-    # Import to database
-    print(f"Importing to database (update_existing={update_existing})...")
+    # Stream rows from the Excel file straight into chunked upserts
+    if sync:
+        print(f"Syncing {excel_file}...")
+    else:
+        print(f"Importing {excel_file} (update_existing={update_existing})...")
     db = SessionLocal()
     try:
-        stats = import_memes_to_db(memes, db, update_existing=update_existing)
+        # Bulk imports may run longer than the bot's per-statement timeout
+        db.execute(text("SET statement_timeout = 0"))
+        if sync:
+            stats = sync_memes_to_db(iter_unique_xlsx(excel_file), db)
+        else:
+            stats = import_memes_to_db(
+                iter_unique_xlsx(excel_file), db, update_existing=update_existing
+            )
+        if not stats["total"]:
+            print("No memes found in Excel file")
+            sys.exit(1)
         print("\nImport completed!")
+        print(f"  Rows read: {stats['total']}")
         print(f"  Inserted: {stats['inserted']}")
         print(f"  Updated: {stats['updated']}")
+        if sync:
+            print(f"  Unchanged: {stats['unchanged']}")
+            print(f"  Deleted: {stats['deleted']}")
         print(f"  Skipped: {stats['skipped']}")
         print(f"  Errors: {stats['errors']}")
         if stats["aliases_generated"] > 0:
             print(f"  Aliases generated: {stats['aliases_generated']}")
+        if stats["embeddings"] > 0:
+            print(f"  Embeddings computed: {stats['embeddings']}")
+        if stats["version"] is not None:
+            print(f"  Catalogue version: {stats['version']}")
     finally:
         db.close()
 